@@ -22,6 +22,7 @@
 
 import time
 import sys
+import asyncio
 # import os
 import traceback
 import argparse
@@ -49,6 +50,20 @@ gRestart = False
 MAIN_TICK_DELAY = 0.500  # 500 milli
 
 
+async def init_cache_dbs(redis_config, influx_config):
+    '''
+    Connect Redis and InfluxDB (the enabled ones) side by side,
+    each connect blocks on TCP/handshake
+    '''
+    from db import init_redis_cache_async, init_influx_db_async
+    jobs = []
+    if redis_config.get('enabled', False):
+        jobs.append(init_redis_cache_async(redis_config))
+    if influx_config.get('enabled', False):
+        jobs.append(init_influx_db_async(influx_config))
+    await asyncio.gather(*jobs)
+
+
 def Wolfinch_init():
 
     # seed random
@@ -64,7 +79,7 @@ def Wolfinch_init():
         msg = "Step 1: Importing InfluxDB modules..."
         print(msg)
         log.info(msg)
-        from db import init_influx_db, init_redis_cache, init_trade_logger, init_indicator_logger, INFLUX_AVAILABLE
+        from db import init_trade_logger, init_indicator_logger, INFLUX_AVAILABLE
         msg = f"✓ INFLUX_AVAILABLE = {INFLUX_AVAILABLE}"
         print(msg)
         log.info(msg)
@@ -91,34 +106,31 @@ def Wolfinch_init():
                 print(f"✓ cache_db config loaded: {cache_db_config is not None}")
                 
                 if cache_db_config:
-                    # Initialize Redis
-                    print("Step 3: Initializing Redis...")
+                    # Initialize Redis and InfluxDB, connecting concurrently
+                    print("Step 3: Initializing Redis and InfluxDB...")
                     redis_config = cache_db_config.get('redis', {})
+                    influx_config = cache_db_config.get('influxdb', {})
+                    print(f"  InfluxDB enabled: {influx_config.get('enabled', False)}")
+                    asyncio.run(init_cache_dbs(redis_config, influx_config))
+                    
                     if redis_config.get('enabled', False):
-                        init_redis_cache(redis_config)
                         log.info("✓ Redis cache initialized")
                         print("✓ Redis initialized")
                     else:
                         print("⚠ Redis disabled")
                     
-                    # Initialize InfluxDB
-                    print("Step 4: Initializing InfluxDB...")
-                    influx_config = cache_db_config.get('influxdb', {})
-                    print(f"  InfluxDB enabled: {influx_config.get('enabled', False)}")
-                    
                     if influx_config.get('enabled', False):
-                        init_influx_db(influx_config)
                         log.info("✓ InfluxDB initialized")
                         print("✓ InfluxDB initialized")
                         
                         # Initialize Trade Logger
-                        print("Step 5: Initializing TradeLogger...")
+                        print("Step 4: Initializing TradeLogger...")
                         init_trade_logger()
                         log.info("✓ Trade logger initialized")
                         print("✓ TradeLogger initialized")
                         
                         # Initialize Indicator Logger
-                        print("Step 6: Initializing IndicatorLogger...")
+                        print("Step 5: Initializing IndicatorLogger...")
                         init_indicator_logger()
                         log.info("✓ Indicator logger initialized")
                         print("✓ IndicatorLogger initialized")
@@ -139,14 +151,13 @@ def Wolfinch_init():
                 cache_db_config = readConf('config/cache_db.yml')
                 if cache_db_config:
                     redis_config = cache_db_config.get('redis', {})
+                    influx_config = cache_db_config.get('influxdb', {})
+                    asyncio.run(init_cache_dbs(redis_config, influx_config))
                     if redis_config.get('enabled', False):
-                        init_redis_cache(redis_config)
                         log.info("✓ Redis cache initialized")
                         print("✓ Redis initialized")
                     
-                    influx_config = cache_db_config.get('influxdb', {})
                     if influx_config.get('enabled', False):
-                        init_influx_db(influx_config)
                         log.info("✓ InfluxDB initialized")
                         print("✓ InfluxDB initialized")
                         init_trade_logger()
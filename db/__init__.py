@@ -6,8 +6,8 @@ from .position_db import PositionDb
 
 # InfluxDB and Redis support
 try:
-    from .influx_db import init_influx_db, get_influx_db
-    from .redis_cache import init_redis_cache, get_redis_cache
+    from .influx_db import init_influx_db, init_influx_db_async, get_influx_db
+    from .redis_cache import init_redis_cache, init_redis_cache_async, get_redis_cache
     from .candle_db_influx import CandleDBInflux, create_candle_db
     from .trade_logger import TradeLogger, init_trade_logger, get_trade_logger
     from .indicator_logger import IndicatorLogger, init_indicator_logger, get_indicator_logger
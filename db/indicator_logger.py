@@ -62,6 +62,11 @@ class IndicatorLogger:
         """Check if indicator logging is enabled"""
         return self.enabled
 
+    def _write(self, measurement: str, tags: Dict[str, str], fields: Dict[str, float],
+               timestamp: int):
+        """Single sink of all log_* methods"""
+        self.influx.write_point(measurement, tags, fields, timestamp)
+
     def log_indicators(self, exchange: str, product: str, strategy_name: str,
                       timestamp: int, indicators: Dict[str, Any],
                       signal: Optional[Dict[str, Any]] = None) -> bool:
@@ -125,12 +130,7 @@ class IndicatorLogger:
                 return False
 
             # Write to InfluxDB
-            self.influx.write_point(
-                measurement='indicator',
-                tags=tags,
-                fields=fields,
-                timestamp=timestamp
-            )
+            self._write('indicator', tags, fields, timestamp)
 
             log.debug(f"Logged {len(fields)} indicators for {strategy_name} on {product}")
             return True
@@ -193,12 +193,7 @@ class IndicatorLogger:
                             pass
 
             # Write to InfluxDB
-            self.influx.write_point(
-                measurement='strategy_signal',
-                tags=tags,
-                fields=fields,
-                timestamp=timestamp
-            )
+            self._write('strategy_signal', tags, fields, timestamp)
 
             log.debug(f"Logged {signal_type} signal for {strategy_name}: strength={signal_strength}")
             return True
@@ -246,12 +241,7 @@ class IndicatorLogger:
                 return False
 
             # Write to InfluxDB
-            self.influx.write_point(
-                measurement='strategy_performance',
-                tags=tags,
-                fields=fields,
-                timestamp=timestamp
-            )
+            self._write('strategy_performance', tags, fields, timestamp)
 
             log.debug(f"Logged performance metrics for {strategy_name}")
             return True
@@ -20,6 +20,7 @@
 #  You should have received a copy of the GNU General Public License
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 
+import asyncio
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from utils import getLogger
@@ -29,7 +30,7 @@ log.setLevel(log.INFO)
 
 try:
     from influxdb_client import InfluxDBClient, Point, WritePrecision
-    from influxdb_client.client.write_api import SYNCHRONOUS
+    from influxdb_client.client.write_api import SYNCHRONOUS, WriteOptions
     INFLUX_AVAILABLE = True
 except ImportError:
     INFLUX_AVAILABLE = False
@@ -62,6 +63,7 @@ class InfluxDB:
         self.enabled = enabled and INFLUX_AVAILABLE
         self.client = None
         self.write_api = None
+        self._batch_write_api = None
         self.query_api = None
         self.org = org
         self.bucket = bucket
@@ -78,6 +80,7 @@ class InfluxDB:
             # Test connection
             health = self.client.health()
             if health.status == "pass":
+                self._batch_write_api = self._new_batch_write_api()
                 log.info(f"InfluxDB connected: {url} org={org} bucket={bucket}")
             else:
                 log.error(f"InfluxDB health check failed: {health.message}")
@@ -91,13 +94,37 @@ class InfluxDB:
         """Check if InfluxDB is enabled and connected"""
         return self.enabled and self.client is not None
     
+    def _new_batch_write_api(self):
+        """
+        Batching writer for the high volume candle/indicator points. Points are queued
+        and posted by the client in the background, one request per batch_size points
+        or flush_interval ms. Trades and metrics keep using the synchronous write_api.
+        """
+        return self.client.write_api(write_options=WriteOptions(batch_size=5000, flush_interval=1000,
+                                                               jitter_interval=200, retry_interval=5000))
+    
+    def flush(self):
+        """
+        Write out all queued candle/indicator points.
+        WriteApi.flush() of the client is a no-op, closing the batching writer is what
+        drains it, so a new one is opened after.
+        """
+        if self._batch_write_api is None:
+            return
+        try:
+            self._batch_write_api.close()
+        except Exception as e:
+            log.error(f"Error flushing InfluxDB writes: {e}")
+        self._batch_write_api = self._new_batch_write_api()
+    
     # ============ Candle Data Operations ============
     
     def write_candle(self, exchange: str, product: str, timestamp: int, 
                     open_price: float, high: float, low: float, close: float, 
                     volume: float) -> bool:
         """
-        Write a single candle to InfluxDB
+        Write a single candle to InfluxDB. The point is queued on the batching
+        writer, see flush()
         
         Args:
             exchange: Exchange name
@@ -126,7 +153,7 @@ class InfluxDB:
                 .field("volume", float(volume)) \
                 .time(timestamp, WritePrecision.S)
             
-            self.write_api.write(bucket=self.bucket, org=self.org, record=point)
+            self._batch_write_api.write(bucket=self.bucket, org=self.org, record=point)
             return True
         except Exception as e:
             log.error(f"Error writing candle to InfluxDB: {e}")
@@ -161,7 +188,7 @@ class InfluxDB:
                     .time(int(candle['timestamp']), WritePrecision.S)
                 points.append(point)
             
-            self.write_api.write(bucket=self.bucket, org=self.org, record=points)
+            self._batch_write_api.write(bucket=self.bucket, org=self.org, record=points)
             log.info(f"Wrote {len(points)} candles to InfluxDB for {exchange}:{product}")
             return True
         except Exception as e:
@@ -264,12 +291,41 @@ class InfluxDB:
             point = point.field("value", float(value)) \
                 .time(timestamp, WritePrecision.S)
             
-            self.write_api.write(bucket=self.bucket, org=self.org, record=point)
+            self._batch_write_api.write(bucket=self.bucket, org=self.org, record=point)
             return True
         except Exception as e:
             log.error(f"Error writing indicator to InfluxDB: {e}")
             return False
     
+    def write_point(self, measurement: str, tags: Dict[str, str], fields: Dict[str, float],
+                    timestamp: int) -> bool:
+        """
+        Write a point with prebuilt tags and fields (IndicatorLogger payloads).
+        The dict record is serialized by the client straight to line protocol,
+        no Point builder calls per tag/field. Queued on the batching writer.
+        
+        Args:
+            measurement: Measurement name (e.g., 'indicator', 'strategy_signal')
+            tags: Tag dictionary
+            fields: Field dictionary
+            timestamp: Unix timestamp (seconds)
+        
+        Returns:
+            True if successful
+        """
+        if not self.is_enabled():
+            return False
+        
+        try:
+            self._batch_write_api.write(bucket=self.bucket, org=self.org,
+                                        record={'measurement': measurement, 'tags': tags,
+                                                'fields': fields, 'time': timestamp},
+                                        write_precision=WritePrecision.S)
+            return True
+        except Exception as e:
+            log.error(f"Error writing {measurement} point to InfluxDB: {e}")
+            return False
+    
     # ============ Trade Data Operations ============
     
     def write_trade(self, exchange: str, product: str, timestamp: int,
@@ -378,6 +434,9 @@ class InfluxDB:
         """Close InfluxDB connection"""
         if self.client:
             try:
+                if self._batch_write_api is not None:
+                    self._batch_write_api.close()
+                    self._batch_write_api = None
                 self.client.close()
                 log.info("InfluxDB connection closed")
             except Exception as e:
@@ -399,6 +458,13 @@ def init_influx_db(config: Dict) -> InfluxDB:
     )
     return _influx_db
 
+async def init_influx_db_async(config: Dict) -> InfluxDB:
+    """
+    init_influx_db() on a worker thread. The connect blocks on TCP/handshake, this lets
+    it be awaited together with the other db connects (asyncio.gather)
+    """
+    return await asyncio.to_thread(init_influx_db, config)
+
 def get_influx_db() -> Optional[InfluxDB]:
     """Get global InfluxDB instance"""
     return _influx_db
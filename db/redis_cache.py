@@ -22,6 +22,7 @@
 
 import json
 import pickle
+import asyncio
 from typing import Any, Optional, List, Dict
 from utils import getLogger
 
@@ -35,6 +36,23 @@ except ImportError:
     REDIS_AVAILABLE = False
     log.warning("Redis not available. Install with: pip install redis hiredis")
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_json(value: Any) -> bytes:
+    """JSON encode, numpy scalars/arrays included. orjson if installed, stdlib json otherwise"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, default=lambda o: o.tolist()).encode()
+
+
+def _loads_json(data: bytes) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
 
 class RedisCache:
     """
@@ -172,6 +190,24 @@ class RedisCache:
             log.error(f"Redis EXPIRE error for key '{key}': {e}")
             return False
     
+    def pipeline(self):
+        """
+        Non-transactional pipeline, queued commands go out in one round trip on execute().
+        Values are sent as is, pickle them the way set()/rpush() do.
+        
+        Returns:
+            redis Pipeline, None if Redis is disabled
+        
+        Example:
+            with cache.pipeline() as p:
+                p.set(key1, pickle.dumps(value1))
+                p.set(key2, pickle.dumps(value2))
+                p.execute()
+        """
+        if not self.is_enabled():
+            return None
+        return self.client.pipeline(transaction=False)
+    
     # ============ List Operations ============
     
     def lpush(self, key: str, *values: Any) -> int:
@@ -285,6 +321,46 @@ class RedisCache:
         key = f"indicator:{exchange}:{product}:{indicator}:{period}"
         return self.get(key, default)
     
+    def cache_strategy_indicators(self, exchange: str, product: str, strategy: str,
+                                  indicators: Dict[str, Any], ttl: int = 300) -> bool:
+        """
+        Cache the latest indicator values of a strategy, all in one pipelined round trip.
+        Values are stored as JSON, numpy values need no float() conversion.
+        
+        Args:
+            exchange: Exchange name
+            product: Product ID
+            strategy: Strategy name
+            indicators: Dictionary of indicator values
+            ttl: Time to live in seconds (default: 5 minutes)
+        """
+        if not self.is_enabled():
+            return False
+        
+        try:
+            with self.pipeline() as p:
+                for name, value in indicators.items():
+                    p.setex(f"indicator:{exchange}:{product}:{strategy}:{name}", ttl, _dumps_json(value))
+                p.execute()
+            return True
+        except Exception as e:
+            log.error(f"Error caching indicators for {strategy}: {e}")
+            return False
+    
+    def get_strategy_indicators(self, exchange: str, product: str, strategy: str,
+                                names: List[str]) -> Dict[str, Any]:
+        """Get cached indicator values of a strategy (one MGET), missing ones are left out"""
+        if not self.is_enabled() or not names:
+            return {}
+        
+        try:
+            values = self.client.mget([f"indicator:{exchange}:{product}:{strategy}:{name}"
+                                       for name in names])
+            return {name: _loads_json(v) for name, v in zip(names, values) if v is not None}
+        except Exception as e:
+            log.error(f"Error getting indicators for {strategy}: {e}")
+            return {}
+    
     def cache_candles(self, exchange: str, product: str, candles: List[Any], 
                      max_candles: int = 1000) -> bool:
         """
@@ -296,12 +372,17 @@ class RedisCache:
             candles: List of candle objects
             max_candles: Maximum candles to keep
         """
+        if not self.is_enabled():
+            return False
+        
         key = f"candles:{exchange}:{product}"
         try:
-            # Add new candles to the right
-            self.rpush(key, *candles)
-            # Trim to keep only recent candles
-            self.ltrim(key, -max_candles, -1)
+            with self.pipeline() as p:
+                # Add new candles to the right
+                p.rpush(key, *[pickle.dumps(c) for c in candles])
+                # Trim to keep only recent candles
+                p.ltrim(key, -max_candles, -1)
+                p.execute()
             return True
         except Exception as e:
             log.error(f"Error caching candles: {e}")
@@ -390,6 +471,13 @@ def init_redis_cache(config: Dict) -> RedisCache:
     )
     return _redis_cache
 
+async def init_redis_cache_async(config: Dict) -> RedisCache:
+    """
+    init_redis_cache() on a worker thread. The connect blocks on TCP/handshake, this lets
+    it be awaited together with the other db connects (asyncio.gather)
+    """
+    return await asyncio.to_thread(init_redis_cache, config)
+
 def get_redis_cache() -> Optional[RedisCache]:
     """Get global Redis cache instance"""
     return _redis_cache
@@ -1,2 +1,3 @@
 from .indicators_config import Configure
+from .indicators.indicator import begin_tick
 # from .indicator import Indicator
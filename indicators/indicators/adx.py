@@ -19,7 +19,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -37,9 +37,9 @@ class ADX (Indicator):
         if candles_len < self.period+20: #make sure 20 more candles are available to work with
             return 0
         
-        close_array = np.array([float(x['ohlc'].close) for x in candles[-(self.period+20):]])
-        high_array = np.array([float(x['ohlc'].high) for x in candles[-(self.period+20):]])
-        low_array = np.array([float(x['ohlc'].low) for x in candles[-(self.period+20):]])
+        close_array = column(candles, 'close', self.period+20)
+        high_array = column(candles, 'high', self.period+20)
+        low_array = column(candles, 'low', self.period+20)
         
         #calculate 
         adx = ti.adx (high_array, low_array, close_array, self.period)
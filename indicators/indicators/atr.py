@@ -18,7 +18,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -36,9 +36,9 @@ class ATR (Indicator):
         if candles_len < self.period+1:
             return float(0)
         
-        high_array = np.array([float(x['ohlc'].high) for x in candles[-(self.period+1):]])
-        low_array = np.array([float(x['ohlc'].low) for x in candles[-(self.period+1):]])        
-        close_array = np.array([float(x['ohlc'].close) for x in candles[-(self.period+1):]])
+        high_array = column(candles, 'high', self.period+1)
+        low_array = column(candles, 'low', self.period+1)        
+        close_array = column(candles, 'close', self.period+1)
         
         #calculate 
         cur_atr = ti.atr (high_array, low_array, close_array, period=self.period)
@@ -20,7 +20,7 @@
 # '''
 
 # from decimal import Decimal
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -39,7 +39,7 @@ class BBANDS (Indicator):
         if candles_len < self.period:
             return float(0)
         
-        val_array = np.array([float(x['ohlc'].close) for x in candles[-self.period:]])
+        val_array = column(candles, 'close', self.period)
         
         #calculate 
         (upperband, middleband, lowerband) = ti.bbands (val_array, period=self.period, stddev=self.stddev)
@@ -19,7 +19,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -37,9 +37,9 @@ class CCI (Indicator):
         if candles_len < self.period:
             return 0
         
-        close_array = np.array([float(x['ohlc'].close) for x in candles[-self.period:]])
-        high_array = np.array([float(x['ohlc'].high) for x in candles[-self.period:]])
-        low_array = np.array([float(x['ohlc'].low) for x in candles[-self.period:]])
+        close_array = column(candles, 'close', self.period)
+        high_array = column(candles, 'high', self.period)
+        low_array = column(candles, 'low', self.period)
         
         #calculate 
         cci = ti.cci (high_array, low_array, close_array, period=self.period)
@@ -20,7 +20,7 @@
 # '''
 
 # from decimal import Decimal
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -38,7 +38,7 @@ class EMA (Indicator):
         if candles_len < self.period:
             return float(0)
         
-        val_array = np.array([float(x['ohlc'].close) for x in candles[-self.period:]])
+        val_array = column(candles, 'close', self.period)
         
         #calculate ema
         cur_ema = ti.ema (val_array, self.period)
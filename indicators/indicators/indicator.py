@@ -18,6 +18,46 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 '''
 from abc import ABCMeta, abstractmethod
+import numpy as np
+
+# per-tick candle columns, see begin_tick()
+_tick_candle = None
+_tick_cols = {}
+
+# column builders with the field access spelled out, getattr(ohlc, field) is slower
+_column_builders = {
+    'open': lambda tail: np.array([float(x['ohlc'].open) for x in tail]),
+    'high': lambda tail: np.array([float(x['ohlc'].high) for x in tail]),
+    'low': lambda tail: np.array([float(x['ohlc'].low) for x in tail]),
+    'close': lambda tail: np.array([float(x['ohlc'].close) for x in tail]),
+    'volume': lambda tail: np.array([float(x['ohlc'].volume) for x in tail]),
+}
+
+def begin_tick (candle):
+    '''
+    Start the indicator round of a new candle (the newest entry of the candle list).
+    Within the round the candle columns the indicators read through column() are
+    built once per (field, length) and shared, eg. SMA20, EMA20 and BBANDS20 all
+    get the same close array instead of building one each.
+    '''
+    global _tick_candle
+    _tick_candle = candle
+    _tick_cols.clear()
+
+def column (candles, field, n):
+    '''
+    float array of the ohlc field over the last n candles,
+    same as np.array([float(x['ohlc'].<field>) for x in candles[-n:]])
+    '''
+    tail = candles[-n:]
+    if n <= 0 or candles[-1] is not _tick_candle:
+        # not within the round of this candle
+        return _column_builders[field](tail)
+    key = (field, len(tail))
+    col = _tick_cols.get(key)
+    if col is None:
+        col = _tick_cols[key] = _column_builders[field](tail)
+    return col
 
 class Indicator(metaclass=ABCMeta):
     @abstractmethod
@@ -18,7 +18,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -42,7 +42,7 @@ class MACD (Indicator):
         if candles_len < self.long_period:
             return (0, 0, 0)
         
-        close_array = np.array([float(x['ohlc'].close) for x in candles[-self.period:]])
+        close_array = column(candles, 'close', self.period)
         
         #calculate 
         (macd, macdsignal, macdhist) = ti.macd (close_array, short_period=self.short_period,
@@ -18,7 +18,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -36,10 +36,10 @@ class MFI (Indicator):
         if candles_len < self.period+1:
             return float(0)
         
-        high_a = np.array([float(x['ohlc'].high) for x in candles[-(self.period+1):]])
-        low_a = np.array([float(x['ohlc'].low) for x in candles[-(self.period+1):]])
-        close_a = np.array([float(x['ohlc'].close) for x in candles[-(self.period+1):]])        
-        volume_a = np.array([float(x['ohlc'].volume) for x in candles[-(self.period+1):]])
+        high_a = column(candles, 'high', self.period+1)
+        low_a = column(candles, 'low', self.period+1)
+        close_a = column(candles, 'close', self.period+1)        
+        volume_a = column(candles, 'volume', self.period+1)
         
         #calculate 
         cur_mfi = ti.mfi (high_a, low_a, close_a, volume_a, period=self.period)
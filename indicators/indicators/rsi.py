@@ -18,7 +18,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -36,7 +36,7 @@ class RSI (Indicator):
         if candles_len < self.period+1:
             return float(0)
         
-        val_array = np.array([float(x['ohlc'].close) for x in candles[-(self.period+1):]])
+        val_array = column(candles, 'close', self.period+1)
         
         #calculate 
         cur_rsi = ti.rsi (val_array, period=self.period)
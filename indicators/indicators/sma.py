@@ -17,7 +17,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 
 class SMA (Indicator):
     '''
@@ -32,5 +32,5 @@ class SMA (Indicator):
         if len(candles) < self.period:
             return 0
         #(time, o, h,l,c, vol)
-        return  float(sum( [x['ohlc'].close for x in candles[-self.period:]]))/self.period
+        return  float(sum(column(candles, 'close', self.period).tolist()))/self.period
         
@@ -0,0 +1,54 @@
+# '''
+#  Desc: Market Stochastic Oscillator (STOCH) implementation using tulip
+#  https://tulipindicators.org/stoch
+#
+#  Copyright: (c) 2017-2020 Joshith Rayaroth Koderi
+#  This file is part of Wolfinch.
+# 
+#  Wolfinch is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+# 
+#  Wolfinch is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+# 
+#  You should have received a copy of the GNU General Public License
+#  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
+# '''
+
+from collections import namedtuple
+from .indicator import Indicator, column
+import numpy as np
+import tulipy as ti
+
+StochResult = namedtuple('StochResult', 'k d')
+
+class STOCH (Indicator):
+    '''
+    Stochastic Oscillator (Momentum Indicators) implementation using TA library
+    Returns StochResult(k, d)
+    '''
+    
+    def __init__(self, name, k_period=14, d_period=3):
+        self.name = name
+        self.k_period = k_period
+        self.d_period = d_period
+        self.period = k_period + 2*d_period
+                
+    def calculate(self, candles):        
+        candles_len = len(candles)
+        if candles_len < self.period:
+            return StochResult(50.0, 50.0)
+        
+        high_array = column(candles, 'high', self.period)
+        low_array = column(candles, 'low', self.period)
+        close_array = column(candles, 'close', self.period)
+        
+        #calculate 
+        (stoch_k, stoch_d) = ti.stoch (high_array, low_array, close_array, self.k_period, self.d_period, self.d_period)
+        
+        return StochResult(float(stoch_k[-1]), float(stoch_d[-1]))
+        
@@ -19,7 +19,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -37,7 +37,7 @@ class TRIX (Indicator):
         if candles_len < self.period:
             return float(0)
         
-        val_array = np.array([float(x['ohlc'].close) for x in candles[-self.period:]])
+        val_array = column(candles, 'close', self.period)
         
         #calculate trix
         cur_trix = ti.trix (val_array, period=self.period/3)
@@ -18,7 +18,7 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 # '''
 
-from .indicator import Indicator
+from .indicator import Indicator, column
 import numpy as np
 import tulipy as ti
 
@@ -38,7 +38,7 @@ class VOSC (Indicator):
         if candles_len < self.period+1:
             return float(0)
         
-        val_array = np.array([float(x['ohlc'].volume) for x in candles[-(self.period+1):]])
+        val_array = column(candles, 'volume', self.period+1)
         
         #calculate 
         vosc = ti.vosc (val_array, self.short_period, self.long_period)
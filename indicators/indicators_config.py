@@ -49,8 +49,9 @@ def Configure (exchange_name, product_id, config_list):
 #         return market_indicators[exchange_name][product_id]
     
     if not len(config_list):
-        print("no indicators to be configured!! potentially no active strategies!")
-        raise ("no indicators to be configured!! potentially no active strategies!")
+        # strategies that work off raw candles (eg. RANDOM_TRADER) need no indicators
+        print("no indicators to be configured for %s:%s"%(exchange_name, product_id))
+        return []
     
     
     for ind_name, period_list in config_list.items():
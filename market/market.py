@@ -32,6 +32,7 @@ from itertools import product
 from datetime import datetime
 import time
 import random
+import numpy as np
 
 from utils import *
 from .order_book import OrderBook
@@ -39,6 +40,7 @@ from .order import TradeRequest
 from decision import Decision
 import decision
 import db
+import indicators
 import sims
 import strategy
 
@@ -1200,6 +1202,8 @@ class Market:
                     
     def _calculate_all_indicators (self, candle_idx):
 #         log.debug ("setting up all indicators for periods indx: %d"%(candle_idx))
+        # indicators of the same length share the candle columns within the tick
+        indicators.begin_tick(self.market_indicators_data[candle_idx])
         for indicator in self.indicator_calculators:
             start = candle_idx + 1 - (indicator.period + 50)  # TBD: give few more candles(for ta-lib)
             period_data = self.market_indicators_data[(0 if start < 0 else start):candle_idx + 1]
@@ -1214,13 +1218,29 @@ class Market:
         
         log.debug ("re-proessing all strategies for historic data #candles (%d)" % (hist_len))
         log.info ("#strategies(%d) strat_list:%s" % (len(self.market_strategies), str(self.market_strategies)))
-        for idx in range (hist_len):
-            self._process_all_strategies (idx)
+        # strategies with a batch kernel get the whole history in one call
+        batch_strategies = [s for s in self.market_strategies if hasattr(s, "generate_signals_batch")]
+        if batch_strategies:
+            candles_arr = self._get_candles_array()
+            for strat in batch_strategies:
+                signals = strat.generate_signals_batch(candles_arr).tolist()
+                for idx in range (hist_len):
+                    self.market_strategies_data[idx][strat.name] = signals[idx]
+        strat_list = [s for s in self.market_strategies if s not in batch_strategies]
+        if strat_list:
+            for idx in range (hist_len):
+                self._process_all_strategies (idx, strat_list)
         log.debug ("re-proessed all strategies for historic data #candles (%d)" % (hist_len))
+
+    def _get_candles_array (self):
+        # SoA (numpy structured array) copy of the candle history
+        return np.fromiter(((c.time, c.open, c.high, c.low, c.close, c.volume)
+                            for c in self.get_candle_list()),
+                           dtype=strategy.OHLCV_DTYPE, count=len(self.market_indicators_data))
                     
-    def _process_all_strategies (self, candle_idx):
+    def _process_all_strategies (self, candle_idx, strat_list=None):
 #         log.debug ("Processing all strategies for periods indx: %d"%(candle_idx))
-        for strategy in self.market_strategies:
+        for strategy in (self.market_strategies if strat_list is None else strat_list):
             start = candle_idx + 1 - (strategy.period + 50)  # TBD: give few more candles(for ta-lib)
             period_data = self.market_indicators_data[(0 if start < 0 else start):candle_idx + 1]
             new_result = strategy.generate_signal(period_data)
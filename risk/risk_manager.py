@@ -13,6 +13,7 @@
 '''
 
 import json
+import threading
 from datetime import datetime, date
 from decimal import Decimal
 from pathlib import Path
@@ -57,6 +58,12 @@ class RiskManager:
         # Starting capital (for percentage calculations)
         self.starting_capital = self.config.get('starting_capital', 100000)
 
+        # P&L/stats as the API serves them, rebuilt on the first read after a state change.
+        # revision counts the changes, so pollers can tell nothing moved
+        self._snapshot_lock = threading.Lock()
+        self._snapshot = None
+        self.revision = 0
+
         # Persistence
         self.state_file = Path('data/risk_state.json')
         self._load_state()
@@ -92,6 +99,10 @@ class RiskManager:
 
     def _save_state(self):
         """Persist state to file"""
+        # every state change ends up here
+        with self._snapshot_lock:
+            self._snapshot = None
+            self.revision += 1
         try:
             # Ensure data directory exists
             self.state_file.parent.mkdir(parents=True, exist_ok=True)
@@ -271,8 +282,19 @@ class RiskManager:
         """Get all open positions"""
         return self.open_positions
 
+    def snapshot(self):
+        """(revision, daily P&L, stats) as of the last state change, computed once per change"""
+        with self._snapshot_lock:
+            if self._snapshot is None:
+                pnl = self._compute_daily_pnl()
+                self._snapshot = (self.revision, pnl, self._compute_stats(pnl))
+            return self._snapshot
+
     def get_daily_pnl(self):
         """Get current daily P&L (realized + unrealized)"""
+        return dict(self.snapshot()[1])
+
+    def _compute_daily_pnl(self):
         realized_pnl = self.daily_pnl
 
         # Add unrealized P&L from open positions
@@ -290,8 +312,13 @@ class RiskManager:
 
     def get_stats(self):
         """Get comprehensive risk statistics"""
-        pnl = self.get_daily_pnl()
+        stats = self.snapshot()[2]
+        return {**stats,
+                'daily_pnl': dict(stats['daily_pnl']),
+                'limits': dict(stats['limits']),
+                'utilization': dict(stats['utilization'])}
 
+    def _compute_stats(self, pnl):
         return {
             'date': self.current_date.strftime('%Y-%m-%d'),
             'daily_pnl': pnl,
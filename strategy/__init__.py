@@ -1,4 +1,5 @@
 from .config import Configure, Configure_indicators, get_strategy_by_name
+from .strategies.strategy import OHLCV_DTYPE
 # Configure()
 #TEST
 # from strategies.ema_dev import EMA_DEV
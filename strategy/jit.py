@@ -0,0 +1,48 @@
+#! /usr/bin/env python
+'''
+ Wolfinch Auto trading Bot
+ Desc: Numba JIT helpers for strategy kernels
+
+ numba is optional. When it is not installed, njit() degrades to a no-op
+ decorator and the kernels run as plain python.
+'''
+
+import numpy as np
+
+try:
+    from numba import njit as _numba_njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def njit(*args, **kwargs):
+    '''
+    Drop-in for numba.njit, supports both @njit and @njit(sig, cache=True, ...)
+    '''
+    if NUMBA_AVAILABLE:
+        return _numba_njit(*args, **kwargs)
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+    return lambda fn: fn
+
+
+@njit(cache=True)
+def ema_series(x, period):
+    '''
+    EMA of x for every bar. The first 'period' values are the running SMA,
+    the rest follow s(t) = a*x(t) + (1-a)*s(t-1), same seeding as Strategy._ema
+    '''
+    n = x.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    alpha = 2.0 / (period + 1)
+    acc = 0.0
+    for i in range(n):
+        if i < period:
+            acc += x[i]
+            out[i] = acc / (i + 1)
+        else:
+            out[i] = alpha * x[i] + (1 - alpha) * out[i - 1]
+    return out
+
+# EOF
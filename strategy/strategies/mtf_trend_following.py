@@ -44,22 +44,28 @@ class MTF_Trend_Following(Strategy):
         current_price = cur_candle.close
 
         # Get EMAs
-        ema_s = self.indicator(candles, 'EMA', self.ema_short)
-        ema_l = self.indicator(candles, 'EMA', self.ema_long)
-        ema_t = self.indicator(candles, 'EMA', self.ema_trend)
-        ema_s_prev = self.indicator(candles, 'EMA', self.ema_short, history=1)
-        ema_l_prev = self.indicator(candles, 'EMA', self.ema_long, history=1)
+        ema_short = self.ema_short
+        ema_long = self.ema_long
+        ema_s = self._ema(candles, ema_short)
+        ema_l = self._ema(candles, ema_long)
+        ema_t = self._ema(candles, self.ema_trend)
+        ema_s_prev = self._ema(candles, ema_short, history=1)
+        ema_l_prev = self._ema(candles, ema_long, history=1)
 
         # Get RSI and ATR
         rsi = self.indicator(candles, 'RSI', self.rsi_period)
-        atr = self.indicator(candles, 'ATR', self.atr_period)
+        atr = self._atr(candles, self.atr_period)
 
-        if None in [ema_s, ema_l, ema_t, rsi, atr]:
+        if ema_s is None or ema_l is None or ema_t is None or rsi is None or atr is None:
             return 0
 
-        # Update trailing SL
-        self._update_trailing_sl(current_price, atr)
-        if self.trailing_sl and current_price <= self.trailing_sl:
+        # Update trailing SL (inlined _update_trailing_sl)
+        trailing_sl = self.trailing_sl
+        if self.entry_price is not None:
+            new_sl = current_price - atr * self.trailing_atr_mult
+            if trailing_sl is None or new_sl > trailing_sl:
+                self.trailing_sl = trailing_sl = new_sl
+        if trailing_sl and current_price <= trailing_sl:
             self._reset_trailing_sl()
             return -3
 
@@ -18,11 +18,35 @@
 #  You should have received a copy of the GNU General Public License
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 
-import random
 import time
+import numpy as np
 from .strategy import Strategy
 from strategy.strategy_logger import create_strategy_logger
 
+
+class _RandBuffer(object):
+    '''
+    Pre-generated batch of random ints in [low, high], refilled in chunks.
+    Amortizes the PRNG cost over a whole buffer instead of one call per candle
+    '''
+    def __init__(self, rng, low, high, size=8192):
+        self.rng = rng
+        self.low = low
+        self.high = high
+        self.size = size
+        self._refill()
+
+    def _refill(self):
+        self.buf = self.rng.integers(self.low, self.high + 1, size=self.size).tolist()
+        self.idx = 0
+
+    def __call__(self):
+        if self.idx == self.size:
+            self._refill()
+        val = self.buf[self.idx]
+        self.idx += 1
+        return val
+
 class RANDOM_TRADER(Strategy):
     """
     Random Trading Strategy for Testing
@@ -64,8 +88,10 @@ class RANDOM_TRADER(Strategy):
         self.position_candles = 0  # How long we've held the position
         self.last_signal = 0
         
-        # Configure indicators (we'll use close price for reference)
-        self.set_indicator("close")
+        # Batched random numbers, one draw per use
+        self._rng = np.random.default_rng()
+        self._rand100 = _RandBuffer(self._rng, 1, 100)
+        self._rand_strength = _RandBuffer(self._rng, 1, self.max_signal_strength)
         
         # Initialize indicator logger (will be set when strategy is attached to market)
         self.indicator_logger = None
@@ -83,11 +109,6 @@ class RANDOM_TRADER(Strategy):
         if len_candles < self.period:
             return 0
         
-        # Get current price for logging (candles are dicts with 'ohlc' key)
-        current_candle = candles[-1]['ohlc'] if len_candles > 0 else None
-        current_price = current_candle.close if current_candle else 0
-        current_volume = current_candle.volume if current_candle else 0
-        
         # If we have a position, track how long we've held it
         if self.position:
             self.position_candles += 1
@@ -95,17 +116,17 @@ class RANDOM_TRADER(Strategy):
         # Exit logic: Random exit after holding for minimum candles
         if self.position and self.position_candles >= self.hold_candles:
             # 30% chance to exit each candle after minimum hold period
-            if random.randint(1, 100) <= 30:
+            if self._rand100() <= 30:
                 if self.position == 'buy':
                     # Exit long position (sell)
-                    signal = -random.randint(1, self.max_signal_strength)
+                    signal = -self._rand_strength()
                     self.position = None
                     self.position_candles = 0
                     self.last_signal = signal
                     return signal
                 elif self.position == 'sell':
                     # Exit short position (buy to cover)
-                    signal = random.randint(1, self.max_signal_strength)
+                    signal = self._rand_strength()
                     self.position = None
                     self.position_candles = 0
                     self.last_signal = signal
@@ -114,10 +135,10 @@ class RANDOM_TRADER(Strategy):
         # Entry logic: Random entry if no position
         if not self.position:
             # Check if we should generate a trade signal
-            if random.randint(1, 100) <= self.trade_probability:
+            if self._rand100() <= self.trade_probability:
                 # Randomly decide buy or sell
-                direction = random.choice(['buy', 'sell'])
-                strength = random.randint(1, self.max_signal_strength)
+                direction = 'buy' if self._rand100() <= 50 else 'sell'
+                strength = self._rand_strength()
                 
                 if direction == 'buy':
                     signal = strength
@@ -150,7 +171,9 @@ class AGGRESSIVE_RANDOM(Strategy):
         self.position = None
         self.candles_in_position = 0
         
-        self.set_indicator("close")
+        self._rng = np.random.default_rng()
+        self._rand100 = _RandBuffer(self._rng, 1, 100)
+        self._rand_hold = _RandBuffer(self._rng, 3, 5)
     
     def generate_signal(self, candles):
         """
@@ -165,15 +188,15 @@ class AGGRESSIVE_RANDOM(Strategy):
             self.candles_in_position += 1
             
             # Exit after 3-5 candles
-            if self.candles_in_position >= random.randint(3, 5):
+            if self.candles_in_position >= self._rand_hold():
                 signal = -3 if self.position == 'buy' else 3
                 self.position = None
                 self.candles_in_position = 0
                 return signal
         else:
             # Enter position with 50% probability
-            if random.randint(1, 100) <= 50:
-                self.position = random.choice(['buy', 'sell'])
+            if self._rand100() <= 50:
+                self.position = 'buy' if self._rand100() <= 50 else 'sell'
                 self.candles_in_position = 0
                 return 3 if self.position == 'buy' else -3
         
@@ -196,8 +219,6 @@ class SIMPLE_RANDOM(Strategy):
         self.trade_every_n_candles = trade_every_n_candles
         self.candle_count = 0
         self.last_action = None
-        
-        self.set_indicator("close")
     
     def generate_signal(self, candles):
         """
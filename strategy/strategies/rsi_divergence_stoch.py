@@ -4,7 +4,73 @@
  Detects divergences and uses Stochastic for timing
 '''
 
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import tulipy as ti
 from .strategy import Strategy
+from strategy.jit import njit
+
+
+def _divergence_masks(closes, rsis, window=20):
+    '''
+    Bullish/bearish divergence flags for every bar of the series at once, same
+    first vs. last of the trailing window check as the per-bar detectors
+    '''
+    n = closes.shape[0]
+    bull = np.zeros(n, dtype=np.bool_)
+    bear = np.zeros(n, dtype=np.bool_)
+    if n >= window:
+        cw = sliding_window_view(closes, window)
+        rw = sliding_window_view(rsis, window)
+        bull[window-1:] = (cw[:, -1] < cw[:, 0]) & (rw[:, -1] > rw[:, 0])
+        bear[window-1:] = (cw[:, -1] > cw[:, 0]) & (rw[:, -1] < rw[:, 0])
+    return bull, bear
+
+
+@njit(cache=True)
+def _rsi_div_stoch_batch(close, rsi, stoch_k, stoch_d, bull, bear, period, oversold, overbought, sl_frac):
+    '''
+    RSI_Divergence_Stoch.generate_signal over the whole history in one pass.
+    NaN stands for None in the trailing SL state.
+    '''
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    entry_price = np.nan
+    highest_price = np.nan
+    trailing_sl = np.nan
+    for i in range(period - 1, n):
+        price = close[i]
+        k = stoch_k[i]
+        d = stoch_d[i]
+
+        # Update trailing SL
+        if entry_price == entry_price:
+            if highest_price != highest_price or price > highest_price:
+                highest_price = price
+            trailing_sl = highest_price * (1 - sl_frac)
+        if trailing_sl == trailing_sl and trailing_sl != 0 and price <= trailing_sl:
+            entry_price = highest_price = trailing_sl = np.nan
+            out[i] = -3
+            continue
+
+        # BUY SIGNAL
+        oversold_cross = k < oversold and k > d
+        if bull[i] and oversold_cross:
+            entry_price = highest_price = price
+            out[i] = 3
+            continue
+        elif rsi[i] < 30 and oversold_cross:
+            out[i] = 2
+            continue
+
+        # SELL SIGNAL
+        overbought_cross = k > overbought and k < d
+        if bear[i] and overbought_cross:
+            entry_price = highest_price = trailing_sl = np.nan
+            out[i] = -3
+        elif rsi[i] > 70 and overbought_cross:
+            out[i] = -2
+    return out
 
 
 class RSI_Divergence_Stoch(Strategy):
@@ -28,14 +94,20 @@ class RSI_Divergence_Stoch(Strategy):
         self.stoch_oversold = stoch_oversold
         self.stoch_overbought = stoch_overbought
         self.trailing_sl_percent = trailing_sl_percent
+        self._inv_sl = 1.0 - trailing_sl_percent / 100.0
 
         self.set_indicator("RSI", self.rsi_period)
-        self.set_indicator("STOCH", [self.stoch_k, self.stoch_d])
+        # (k, d) tuple inside a set keeps both params on one STOCH indicator
+        self.set_indicator("STOCH", {(self.stoch_k, self.stoch_d)})
 
         self.entry_price = None
         self.highest_price = None
         self.trailing_sl = None
 
+        # rolling close/RSI windows used by the divergence checks, refreshed once per bar
+        self._close_buf = np.empty(0, dtype=np.float64)
+        self._rsi_buf = np.empty(0, dtype=np.float64)
+
     def generate_signal(self, candles):
         if len(candles) < self.period:
             return 0
@@ -43,30 +115,38 @@ class RSI_Divergence_Stoch(Strategy):
         cur_candle = candles[-1]
         current_price = cur_candle.close
 
+        self._update_ohlcv(candles)
+        self._close_buf = self.closes[-20:]
+        self._rsi_buf = np.fromiter((r or 50 for r in self.indicator(candles, 'RSI', self.rsi_period, history=20)),
+                                    dtype=np.float64, count=self._close_buf.size)
+
         # Get indicators
         rsi = self.indicator(candles, 'RSI', self.rsi_period)
-        rsi_prev = self.indicator(candles, 'RSI', self.rsi_period, history=1)
-        stoch = self.indicator(candles, 'STOCH', [self.stoch_k, self.stoch_d])
+        stoch = self.indicator(candles, 'STOCH', (self.stoch_k, self.stoch_d))
 
-        if None in [rsi, stoch]:
+        if rsi is None or stoch is None:
             return 0
 
-        stoch_k = stoch.get('k', 50)
-        stoch_d = stoch.get('d', 50)
+        stoch_k, stoch_d = stoch
 
-        # Update trailing SL
-        self._update_trailing_sl(current_price)
-        if self.trailing_sl and current_price <= self.trailing_sl:
+        # Update trailing SL (inlined _update_trailing_sl)
+        trailing_sl = self.trailing_sl
+        if self.entry_price is not None:
+            highest_price = self.highest_price
+            if highest_price is None or current_price > highest_price:
+                self.highest_price = highest_price = current_price
+            self.trailing_sl = trailing_sl = highest_price * self._inv_sl
+        if trailing_sl and current_price <= trailing_sl:
             self._reset_trailing_sl()
             return -3
 
         # Detect bullish divergence (simplified)
         # Price makes lower low but RSI makes higher low
-        bullish_divergence = self._detect_bullish_divergence(candles)
+        bullish_divergence = self._detect_bullish_divergence()
 
         # Detect bearish divergence
         # Price makes higher high but RSI makes lower high
-        bearish_divergence = self._detect_bearish_divergence(candles)
+        bearish_divergence = self._detect_bearish_divergence()
 
         # BUY SIGNAL
         stoch_oversold_cross = stoch_k < self.stoch_oversold and stoch_k > stoch_d
@@ -91,49 +171,60 @@ class RSI_Divergence_Stoch(Strategy):
 
         return 0
 
-    def _detect_bullish_divergence(self, candles):
+    def _detect_bullish_divergence(self):
         """Simplified bullish divergence detection"""
-        if len(candles) < 20:
-            return False
-
-        # Compare recent lows
-        prices = [c.close for c in candles[-20:]]
-        rsis = [self.indicator(candles[:i+1], 'RSI', self.rsi_period) or 50
-                for i in range(len(candles)-20, len(candles))]
-
-        if len(prices) < 10 or len(rsis) < 10:
+        closes = self._close_buf
+        if closes.size < 20:
             return False
 
         # Simple check: if price trending down but RSI trending up
-        price_trend = prices[-1] < prices[0]
-        rsi_trend = rsis[-1] > rsis[0]
-
-        return price_trend and rsi_trend
+        rsis = self._rsi_buf
+        return closes[-1] < closes[0] and rsis[-1] > rsis[0]
 
-    def _detect_bearish_divergence(self, candles):
+    def _detect_bearish_divergence(self):
         """Simplified bearish divergence detection"""
-        if len(candles) < 20:
-            return False
-
-        prices = [c.close for c in candles[-20:]]
-        rsis = [self.indicator(candles[:i+1], 'RSI', self.rsi_period) or 50
-                for i in range(len(candles)-20, len(candles))]
-
-        if len(prices) < 10 or len(rsis) < 10:
+        closes = self._close_buf
+        if closes.size < 20:
             return False
 
         # Simple check: if price trending up but RSI trending down
-        price_trend = prices[-1] > prices[0]
-        rsi_trend = rsis[-1] < rsis[0]
-
-        return price_trend and rsi_trend
+        rsis = self._rsi_buf
+        return closes[-1] > closes[0] and rsis[-1] < rsis[0]
+
+    def generate_signals_batch(self, candles_arr):
+        '''
+        Signals for every candle of an OHLCV_DTYPE history, for backtesting.
+        RSI/STOCH are computed over the full series and the divergence flags
+        for all bars come from one sliding window pass.
+        '''
+        close = np.ascontiguousarray(candles_arr['close'], dtype=np.float64)
+        high = np.ascontiguousarray(candles_arr['high'], dtype=np.float64)
+        low = np.ascontiguousarray(candles_arr['low'], dtype=np.float64)
+        n = close.shape[0]
+
+        # indicator outputs are shorter than the input, pad the warm-up bars as neutral
+        rsi = np.full(n, 50.0)
+        stoch_k = np.full(n, 50.0)
+        stoch_d = np.full(n, 50.0)
+        if n > self.rsi_period:
+            r = ti.rsi(close, period=self.rsi_period)
+            rsi[n-len(r):] = r
+        if n >= self.stoch_k + 2*self.stoch_d:
+            k, d = ti.stoch(high, low, close, self.stoch_k, self.stoch_d, self.stoch_d)
+            stoch_k[n-len(k):] = k
+            stoch_d[n-len(d):] = d
+
+        bull, bear = _divergence_masks(close, rsi)
+        return _rsi_div_stoch_batch(close, rsi, stoch_k, stoch_d, bull, bear, self.period,
+                                    float(self.stoch_oversold), float(self.stoch_overbought),
+                                    self.trailing_sl_percent / 100)
 
     def _update_trailing_sl(self, current_price):
         if self.entry_price is None:
             return
         if self.highest_price is None or current_price > self.highest_price:
             self.highest_price = current_price
-        self.trailing_sl = self.highest_price * (1 - self.trailing_sl_percent / 100)
+        self.trailing_sl = self.highest_price * self._inv_sl
 
     def _reset_trailing_sl(self):
         self.entry_price = None
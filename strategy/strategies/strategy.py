@@ -18,8 +18,18 @@
 #  along with Wolfinch.  If not, see <https://www.gnu.org/licenses/>.
 
 from abc import ABCMeta, abstractmethod
+import numpy as np
+
+# candle fields, the layout handed to generate_signals_batch() and of the Strategy candle columns
+OHLCV_DTYPE = np.dtype([('time', np.int64), ('open', np.float64), ('high', np.float64),
+                        ('low', np.float64), ('close', np.float64), ('volume', np.float64)])
 
 class Strategy(metaclass=ABCMeta):
+    # state of the base class helpers. A strategy that declares its own __slots__ has no
+    # __dict__ (see Volume_Breakout_ATR), the others get one as usual
+    __slots__ = ('_indicator_list', '_indicator_slots', '_ohlcv_buf', '_ohlcv_cap', '_ohlcv_end',
+                 '_ohlcv_n', '_candles_last', '_ema_state', '_atr_state')
+
     @abstractmethod
     def __init__ (self):
         ''' 
@@ -34,8 +44,17 @@ class Strategy(metaclass=ABCMeta):
     def configure (self):
         pass
     
-    def set_indicator (self, name, periods=0):
-        
+    def set_indicator (self, name, periods=0, slot=None):
+        '''
+        Register an indicator to be computed for this strategy. With slot, the latest
+        value of the indicator is also copied into self.<slot> on every new candle
+        (see _update_ohlcv), so generate_signal can read it without an indicator() lookup.
+        '''
+        if slot is not None:
+            if not hasattr(self, "_indicator_slots"):
+                self._indicator_slots = {}
+            self._indicator_slots[slot] = name if periods == 0 else '%s%s'%(name, str(periods))
+            setattr(self, slot, None)
         if not hasattr(self, "_indicator_list"):
             self._indicator_list = {}
         ind = self._indicator_list.get(name, None)
@@ -73,6 +92,139 @@ class Strategy(metaclass=ABCMeta):
             return candles[-1][i_name]
         else:
             return [c[i_name] for c in candles[-history:]]
+
+    def _update_ohlcv (self, candles):
+        '''
+        Keep the SoA candle columns (self.closes, self.highs, ...) in sync with the candle window.
+        Each column is a preallocated array that only gets the new candle appended each bar,
+        so reading/slicing them (eg. self.closes[-20:]) doesn't touch the candle objects.
+        Fires on_new_candle() for every candle it hasn't seen yet and fills the
+        indicator slots from the newest one.
+        '''
+        n = len(candles)
+        cdl = candles[-1]
+        last = getattr(self, "_candles_last", None)
+        if last is None:
+            for c in candles:
+                self.on_new_candle(c)
+        elif last is not cdl:
+            self.on_new_candle(cdl)
+        if last is not cdl:
+            for slot, i_name in getattr(self, "_indicator_slots", {}).items():
+                setattr(self, slot, cdl[i_name])
+        if getattr(self, "_ohlcv_buf", None) is None or self._ohlcv_end < n or self._ohlcv_cap < 2*n:
+            cap = self._ohlcv_cap = max(2*n, 256)
+            self._ohlcv_buf = {name: np.empty(cap, dtype=OHLCV_DTYPE[name]) for name in OHLCV_DTYPE.names}
+            self._ohlcv_end = 0
+            for c in candles:
+                self.append_candle(c)
+        elif last is not cdl:
+            self.append_candle(cdl)
+        self._ohlcv_n = n
+        self._candles_last = cdl
+
+    def append_candle (self, candle):
+        '''
+        Append one candle to the SoA columns. When full, the current window is moved to the front.
+        '''
+        buf = self._ohlcv_buf
+        end = self._ohlcv_end
+        if end == self._ohlcv_cap:
+            n = self._ohlcv_n
+            for col in buf.values():
+                col[:n] = col[end-n:end]
+            end = n
+        buf['time'][end] = candle.time
+        buf['open'][end] = candle.open
+        buf['high'][end] = candle.high
+        buf['low'][end] = candle.low
+        buf['close'][end] = candle.close
+        buf['volume'][end] = candle.volume
+        self._ohlcv_end = end + 1
+
+    def _ohlcv_col (self, name):
+        end = self._ohlcv_end
+        return self._ohlcv_buf[name][end-self._ohlcv_n:end]
+
+    # candle window columns, valid after _update_ohlcv()
+    times = property(lambda self: self._ohlcv_col('time'))
+    opens = property(lambda self: self._ohlcv_col('open'))
+    highs = property(lambda self: self._ohlcv_col('high'))
+    lows = property(lambda self: self._ohlcv_col('low'))
+    closes = property(lambda self: self._ohlcv_col('close'))
+    volumes = property(lambda self: self._ohlcv_col('volume'))
+
+    def on_new_candle (self, candle):
+        '''
+        Hook for streaming state, called once per new candle (oldest first)
+        from _update_ohlcv()
+        '''
+        pass
+
+    def _ema (self, candles, period, history=-1):
+        '''
+        Incremental EMA of candle close, s(t) = a*x(t) + (1-a)*s(t-1), a = 2/(period+1)
+        O(1) per new candle. The first call seeds with the SMA of the first 'period'
+        closes of the window and runs the recurrence over the rest of it.
+        history=1 returns the value as of the previous candle.
+        '''
+        if not len(candles):
+            return None
+        if not hasattr(self, "_ema_state"):
+            self._ema_state = {}
+        cdl = candles[-1]
+        state = self._ema_state.get(period)
+        if state is None:
+            alpha = 2.0 / (period + 1)
+            n = min(period, len(candles))
+            cur = sum(c.close for c in candles[:n]) / n
+            prev = cur
+            for c in candles[n:]:
+                prev = cur
+                cur = alpha * c.close + (1 - alpha) * cur
+            # [prev, cur, last candle seen]
+            state = self._ema_state[period] = [prev, cur, cdl]
+        elif state[2] is not cdl:
+            alpha = 2.0 / (period + 1)
+            state[0] = state[1]
+            state[1] = alpha * cdl.close + (1 - alpha) * state[1]
+            state[2] = cdl
+        return state[0] if history == 1 else state[1]
+
+    def _atr (self, candles, period):
+        '''
+        Incremental ATR with Wilder smoothing, atr(t) = ((n-1)*atr(t-1) + tr(t))/n
+        O(1) per new candle. The first call seeds with the mean true range of the
+        first 'period' candles of the window and smooths over the rest of it.
+        '''
+        if len(candles) < 2:
+            return None
+        if not hasattr(self, "_atr_state"):
+            self._atr_state = {}
+        cdl = candles[-1]
+        state = self._atr_state.get(period)
+        if state is None:
+            trs = [candles[0].high - candles[0].low]
+            prev_close = candles[0].close
+            for c in candles[1:]:
+                high = c.high
+                low = c.low
+                trs.append(max(high - low, abs(high - prev_close), abs(low - prev_close)))
+                prev_close = c.close
+            n = min(period, len(trs))
+            atr = sum(trs[:n]) / n
+            for tr in trs[n:]:
+                atr = ((period - 1) * atr + tr) / period
+            # [atr, last candle seen]
+            state = self._atr_state[period] = [atr, cdl]
+        elif state[1] is not cdl:
+            prev_close = candles[-2].close
+            high = cdl.high
+            low = cdl.low
+            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            state[0] = ((period - 1) * state[0] + tr) / period
+            state[1] = cdl
+        return state[0]
             
     def crossover (self, x, y):
         pass
@@ -86,5 +238,10 @@ class Strategy(metaclass=ABCMeta):
         Trade Signale in range(-3..0..3), ==> (strong sell .. 0 .. strong buy) 0 is neutral (hold) signal 
         '''
         return 0
+
+    # Strategies may optionally implement
+    #   generate_signals_batch (self, candles_arr) -> np.int8 array, one signal per candle
+    # where candles_arr is an OHLCV_DTYPE array of the whole history. The backtest
+    # driver then computes all historic signals in one call instead of once per candle.
         
     
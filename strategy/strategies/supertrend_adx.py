@@ -12,6 +12,27 @@
 '''
 
 from .strategy import Strategy
+from strategy.jit import njit
+
+
+@njit(cache=True)
+def _supertrend_step(final_upper, final_lower, prev_close, high, low, close, atr, mult):
+    '''
+    One bar of the Supertrend band recursion.
+    Returns (basic_upper, basic_lower, final_upper, final_lower, supertrend, direction)
+    '''
+    hl_avg = (high + low) / 2
+    basic_upper = hl_avg + mult * atr
+    basic_lower = hl_avg - mult * atr
+
+    if basic_upper < final_upper or prev_close > final_upper:
+        final_upper = basic_upper
+    if basic_lower > final_lower or prev_close < final_lower:
+        final_lower = basic_lower
+
+    if close <= final_upper:
+        return basic_upper, basic_lower, final_upper, final_lower, final_upper, -1  # Bearish
+    return basic_upper, basic_lower, final_upper, final_lower, final_lower, 1  # Bullish
 
 
 class Supertrend_ADX(Strategy):
@@ -66,6 +87,7 @@ class Supertrend_ADX(Strategy):
         self.atr_multiplier = atr_multiplier
         self.adx_period = adx_period
         self.adx_threshold = adx_threshold
+        self._adx_strong = adx_threshold * 1.2
         self.trailing_atr_multiplier = trailing_atr_multiplier
 
         # Register indicators
@@ -86,52 +108,34 @@ class Supertrend_ADX(Strategy):
 
     def calculate_supertrend(self, candles):
         """Calculate Supertrend indicator"""
-        if len(candles) < self.atr_period + 1:
+        atr_period = self.atr_period
+        if len(candles) < atr_period + 1:
             return None, 0
 
         cur_candle = candles[-1]
-        prev_candle = candles[-2] if len(candles) > 1 else None
 
         # Get ATR
-        atr = self.indicator(candles, 'ATR', self.atr_period)
+        atr = self._atr(candles, atr_period)
         if atr is None:
             return None, 0
 
-        # Calculate basic bands
-        hl_avg = (cur_candle.high + cur_candle.low) / 2
-        self.basic_upper_band = hl_avg + (self.atr_multiplier * atr)
-        self.basic_lower_band = hl_avg - (self.atr_multiplier * atr)
-
-        # Calculate final bands
-        if self.final_upper_band is None:
-            self.final_upper_band = self.basic_upper_band
-            self.final_lower_band = self.basic_lower_band
-        else:
-            # Upper band
-            if self.basic_upper_band < self.final_upper_band or \
-               (prev_candle and prev_candle.close > self.final_upper_band):
-                self.final_upper_band = self.basic_upper_band
-            else:
-                self.final_upper_band = self.final_upper_band
-
-            # Lower band
-            if self.basic_lower_band > self.final_lower_band or \
-               (prev_candle and prev_candle.close < self.final_lower_band):
-                self.final_lower_band = self.basic_lower_band
-            else:
-                self.final_lower_band = self.final_lower_band
-
-        # Determine Supertrend direction
-        prev_direction = self.supertrend_direction
-
-        if cur_candle.close <= self.final_upper_band:
-            self.supertrend = self.final_upper_band
-            self.supertrend_direction = -1  # Bearish
-        else:
-            self.supertrend = self.final_lower_band
-            self.supertrend_direction = 1  # Bullish
-
-        return self.supertrend, self.supertrend_direction
+        # Calculate bands and direction on locals, state is written back once.
+        # Unseeded final bands are passed as +/-inf so the first bar takes the basic bands
+        fu = self.final_upper_band
+        fl = self.final_lower_band
+        bu, bl, fu, fl, st, direction = _supertrend_step(
+            float('inf') if fu is None else fu,
+            float('-inf') if fl is None else fl,
+            candles[-2].close, cur_candle.high, cur_candle.low, cur_candle.close,
+            atr, self.atr_multiplier)
+
+        self.basic_upper_band = bu
+        self.basic_lower_band = bl
+        self.final_upper_band = fu
+        self.final_lower_band = fl
+        self.supertrend = st
+        self.supertrend_direction = direction
+        return st, direction
 
     def generate_signal(self, candles):
         """
@@ -146,6 +150,9 @@ class Supertrend_ADX(Strategy):
         cur_candle = candles[-1]
         current_price = cur_candle.close
 
+        # Direction as of the previous bar, before this bar updates the state
+        prev_direction = self.supertrend_direction
+
         # Calculate Supertrend
         supertrend_value, direction = self.calculate_supertrend(candles)
         if supertrend_value is None:
@@ -156,15 +163,17 @@ class Supertrend_ADX(Strategy):
         if adx is None:
             return 0
 
-        # Get previous direction
-        prev_supertrend, prev_direction = self.calculate_supertrend(candles[:-1]) if len(candles) > 1 else (None, 0)
-
-        # Update trailing SL
-        atr = self.indicator(candles, 'ATR', self.atr_period)
-        self._update_trailing_sl(current_price, atr)
+        # Update trailing SL (inlined _update_trailing_sl)
+        trailing_sl = self.trailing_sl
+        if self.entry_price is not None:
+            atr = self._atr(candles, self.atr_period)
+            if atr is not None:
+                new_sl = current_price - atr * self.trailing_atr_multiplier
+                if trailing_sl is None or new_sl > trailing_sl:
+                    self.trailing_sl = trailing_sl = new_sl
 
         # Check trailing SL hit
-        if self.trailing_sl and current_price <= self.trailing_sl:
+        if trailing_sl and current_price <= trailing_sl:
             self._reset_trailing_sl()
             return -3
 
@@ -183,7 +192,7 @@ class Supertrend_ADX(Strategy):
 
         # Continue bullish
         elif direction == 1 and current_price > supertrend_value:
-            if adx >= self.adx_threshold * 1.2:
+            if adx >= self._adx_strong:
                 signal = 1  # Weak buy (trending strongly)
 
         # === SELL SIGNAL ===
@@ -197,7 +206,7 @@ class Supertrend_ADX(Strategy):
 
         # Continue bearish
         elif direction == -1 and current_price < supertrend_value:
-            if adx >= self.adx_threshold * 1.2:
+            if adx >= self._adx_strong:
                 signal = -1  # Weak sell
 
         return signal
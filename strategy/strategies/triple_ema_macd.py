@@ -4,10 +4,102 @@
  Strong trend-following strategy with MACD confirmation
 '''
 
+import numpy as np
 from .strategy import Strategy
+from strategy.jit import njit, ema_series
+
+
+@njit(cache=True)
+def _step_ema3(close, s0, s1, s2, a0, a1, a2):
+    '''
+    Advance three EMA states by one close, s(t) = a*x(t) + (1-a)*s(t-1)
+    '''
+    return (a0 * close + (1 - a0) * s0,
+            a1 * close + (1 - a1) * s1,
+            a2 * close + (1 - a2) * s2)
+
+
+@njit(cache=True)
+def _macd_series(close, a_fast, a_slow, a_sig):
+    '''
+    MACD line and signal line for every bar, same recurrence and seeding as
+    Triple_EMA_MACD._macd_step
+    '''
+    n = close.shape[0]
+    macd_line = np.empty(n, dtype=np.float64)
+    signal_line = np.empty(n, dtype=np.float64)
+    fast = slow = sig = 0.0
+    for i in range(n):
+        x = close[i]
+        if i == 0:
+            fast = slow = x
+            sig = 0.0
+        else:
+            fast = a_fast * x + (1 - a_fast) * fast
+            slow = a_slow * x + (1 - a_slow) * slow
+        line = fast - slow
+        sig = a_sig * line + (1 - a_sig) * sig
+        macd_line[i] = line
+        signal_line[i] = sig
+    return macd_line, signal_line
+
+
+@njit(cache=True)
+def _triple_ema_macd_batch(close, ema_f, ema_m, ema_s, macd_line, signal_line, period, sl_frac):
+    '''
+    Triple_EMA_MACD.generate_signal over the whole history in one pass.
+    Trailing SL state is threaded through scalar locals, NaN stands for None.
+    '''
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    entry_price = np.nan
+    highest_price = np.nan
+    trailing_sl = np.nan
+    for i in range(max(period - 1, 1), n):
+        price = close[i]
+        f = ema_f[i]
+        m = ema_m[i]
+        s = ema_s[i]
+        macd = macd_line[i]
+        sig = signal_line[i]
+        hist = macd - sig
+
+        # Update trailing SL
+        if entry_price == entry_price:
+            if highest_price != highest_price or price > highest_price:
+                highest_price = price
+            trailing_sl = highest_price * (1 - sl_frac)
+        if trailing_sl == trailing_sl and trailing_sl != 0 and price <= trailing_sl:
+            entry_price = highest_price = trailing_sl = np.nan
+            out[i] = -3
+            continue
+
+        # BUY SIGNAL
+        macd_bullish = macd > sig and hist > 0
+        if f > m > s and macd_bullish:
+            if ema_f[i - 1] <= ema_m[i - 1]:
+                entry_price = highest_price = price
+                out[i] = 3
+            else:
+                out[i] = 2
+            continue
+
+        # SELL SIGNAL
+        macd_bearish = macd < sig and hist < 0
+        if f < m < s and macd_bearish:
+            if ema_f[i - 1] >= ema_m[i - 1]:
+                entry_price = highest_price = trailing_sl = np.nan
+                out[i] = -3
+            else:
+                out[i] = -2
+    return out
 
 
 class Triple_EMA_MACD(Strategy):
+    # indexed by aligned | crossed << 1 | macd_confirms << 2
+    _BUY_SIGNALS = (0, 0, 0, 0, 0, 2, 0, 3)
+    _SELL_SIGNALS = (0, 0, 0, 0, 0, -2, 0, -3)
+
     config = {
         'period': {'default': 100, 'var': {'type': int, 'min': 50, 'max': 300}},
         'ema_fast': {'default': 8, 'var': {'type': int, 'min': 5, 'max': 15}},
@@ -32,12 +124,77 @@ class Triple_EMA_MACD(Strategy):
         self.trailing_sl_percent = trailing_sl_percent
 
         self.set_indicator("EMA", [self.ema_fast, self.ema_medium, self.ema_slow])
-        self.set_indicator("MACD", [self.macd_fast, self.macd_slow, self.macd_signal])
 
         self.entry_price = None
         self.highest_price = None
         self.trailing_sl = None
 
+        # fast/medium/slow EMAs advanced together, see _trend_emas()
+        self._ema3_alpha = (2.0 / (ema_fast + 1), 2.0 / (ema_medium + 1), 2.0 / (ema_slow + 1))
+        self._ema3 = None
+
+        # MACD is kept as its own recurrence, see _macd_step()
+        self._macd_alpha = (2.0 / (macd_fast + 1), 2.0 / (macd_slow + 1), 2.0 / (macd_signal + 1))
+        self._macd_state = {'fast': None, 'slow': None, 'sig': None, 'last': None, 'out': None}
+
+    def _trend_emas(self, candles):
+        '''
+        fast, medium, slow EMAs of close and the previous fast/medium values.
+        All three advance in one step per new candle, the first call seeds
+        them through Strategy._ema so the values match it.
+        '''
+        cdl = candles[-1]
+        state = self._ema3
+        if state is None:
+            state = self._ema3 = [self._ema(candles, self.ema_fast), self._ema(candles, self.ema_medium),
+                                  self._ema(candles, self.ema_slow),
+                                  self._ema(candles, self.ema_fast, history=1),
+                                  self._ema(candles, self.ema_medium, history=1), cdl]
+        elif state[5] is not cdl:
+            a0, a1, a2 = self._ema3_alpha
+            ema_f, ema_m, ema_s = _step_ema3(cdl.close, state[0], state[1], state[2], a0, a1, a2)
+            # [fast, medium, slow, fast prev, medium prev, last candle seen]
+            state = self._ema3 = [ema_f, ema_m, ema_s, state[0], state[1], cdl]
+        return state[0], state[1], state[2], state[3], state[4]
+
+    def _macd_step(self, close):
+        '''
+        Advance MACD by one close. Fast/slow EMAs seed with the first close,
+        the signal line with 0.
+        Returns (macd_line, signal_line, histogram)
+        '''
+        state = self._macd_state
+        if state['fast'] is None:
+            fast = slow = close
+            sig = 0.0
+        else:
+            a_fast, a_slow, _ = self._macd_alpha
+            fast = a_fast * close + (1 - a_fast) * state['fast']
+            slow = a_slow * close + (1 - a_slow) * state['slow']
+            sig = state['sig']
+        a_sig = self._macd_alpha[2]
+        macd_line = fast - slow
+        sig = a_sig * macd_line + (1 - a_sig) * sig
+        state['fast'] = fast
+        state['slow'] = slow
+        state['sig'] = sig
+        return macd_line, sig, macd_line - sig
+
+    def _macd(self, candles):
+        '''
+        MACD as of the last candle, stepped once per new candle. The first call
+        warms the recurrence up over the window.
+        '''
+        cdl = candles[-1]
+        state = self._macd_state
+        if state['last'] is not cdl:
+            if state['fast'] is None:
+                for c in candles[:-1]:
+                    self._macd_step(c.close)
+            state['out'] = self._macd_step(cdl.close)
+            state['last'] = cdl
+        return state['out']
+
     def generate_signal(self, candles):
         if len(candles) < self.period:
             return 0
@@ -46,50 +203,50 @@ class Triple_EMA_MACD(Strategy):
         current_price = cur_candle.close
 
         # Get EMAs
-        ema_f = self.indicator(candles, 'EMA', self.ema_fast)
-        ema_m = self.indicator(candles, 'EMA', self.ema_medium)
-        ema_s = self.indicator(candles, 'EMA', self.ema_slow)
-        ema_f_prev = self.indicator(candles, 'EMA', self.ema_fast, history=1)
-        ema_m_prev = self.indicator(candles, 'EMA', self.ema_medium, history=1)
+        ema_f, ema_m, ema_s, ema_f_prev, ema_m_prev = self._trend_emas(candles)
 
         # Get MACD
-        macd = self.indicator(candles, 'MACD', [self.macd_fast, self.macd_slow, self.macd_signal])
+        macd_line, signal_line, macd_hist = self._macd(candles)
 
-        if None in [ema_f, ema_m, ema_s, macd]:
+        if ema_f is None or ema_m is None or ema_s is None:
             return 0
 
-        macd_line = macd['macd']
-        signal_line = macd['signal']
-        macd_hist = macd['histogram']
-
-        # Update trailing SL
-        self._update_trailing_sl(current_price)
-        if self.trailing_sl and current_price <= self.trailing_sl:
+        # Update trailing SL (inlined _update_trailing_sl)
+        trailing_sl = self.trailing_sl
+        if self.entry_price is not None:
+            highest_price = self.highest_price
+            if highest_price is None or current_price > highest_price:
+                self.highest_price = highest_price = current_price
+            self.trailing_sl = trailing_sl = highest_price * (1 - self.trailing_sl_percent / 100)
+        if trailing_sl and current_price <= trailing_sl:
             self._reset_trailing_sl()
             return -3
 
-        # BUY SIGNAL
-        triple_cross_up = (ema_f > ema_m > ema_s) and (ema_f_prev <= ema_m_prev)
-        macd_bullish = macd_line > signal_line and macd_hist > 0
+        # Signal lookup, key = aligned | crossed << 1 | macd_confirms << 2
+        # buy and sell keys can't both be aligned, so at most one table gives a non-zero signal
+        buy_key = (ema_f > ema_m > ema_s) | ((ema_f_prev <= ema_m_prev) << 1) | \
+            ((macd_line > signal_line and macd_hist > 0) << 2)
+        sell_key = (ema_f < ema_m < ema_s) | ((ema_f_prev >= ema_m_prev) << 1) | \
+            ((macd_line < signal_line and macd_hist < 0) << 2)
+        signal = self._BUY_SIGNALS[buy_key] + self._SELL_SIGNALS[sell_key]
 
-        if triple_cross_up and macd_bullish:
+        if signal == 3:
             self.entry_price = current_price
             self.highest_price = current_price
-            return 3
-        elif (ema_f > ema_m > ema_s) and macd_bullish:
-            return 2
-
-        # SELL SIGNAL
-        triple_cross_down = (ema_f < ema_m < ema_s) and (ema_f_prev >= ema_m_prev)
-        macd_bearish = macd_line < signal_line and macd_hist < 0
-
-        if triple_cross_down and macd_bearish:
+        elif signal == -3:
             self._reset_trailing_sl()
-            return -3
-        elif (ema_f < ema_m < ema_s) and macd_bearish:
-            return -2
+        return signal
 
-        return 0
+    def generate_signals_batch(self, candles_arr):
+        '''
+        Signals for every candle of an OHLCV_DTYPE history, for backtesting.
+        EMAs and MACD come from the same recurrences as the live path
+        '''
+        close = np.ascontiguousarray(candles_arr['close'], dtype=np.float64)
+        macd_line, signal_line = _macd_series(close, *self._macd_alpha)
+        return _triple_ema_macd_batch(close, ema_series(close, self.ema_fast), ema_series(close, self.ema_medium),
+                                      ema_series(close, self.ema_slow), macd_line, signal_line,
+                                      self.period, self.trailing_sl_percent / 100)
 
     def _update_trailing_sl(self, current_price):
         if self.entry_price is None:
@@ -4,10 +4,95 @@
  Captures breakout moves with volume confirmation and ATR-based stops
 '''
 
+from collections import deque
+import numpy as np
+import tulipy as ti
 from .strategy import Strategy
-
+from strategy.jit import njit
+
+
+# explicit signature, compiled at import rather than on the first bar
+@njit('Tuple((float64, float64, int8))(float64, float64, float64, float64, float64, float64, '
+      'float64, float64, float64, float64)', cache=True)
+def _vol_breakout_step(price, volume, volume_avg, recent_high, recent_low, atr,
+                       entry_price, trailing_sl, volume_multiplier, atr_sl_multiplier):
+    '''
+    One bar of Volume_Breakout_ATR, returns (entry_price, trailing_sl, signal).
+    NaN stands for None in the trailing SL state.
+    '''
+    # Update trailing SL
+    if entry_price == entry_price:
+        new_sl = price - atr * atr_sl_multiplier
+        if trailing_sl != trailing_sl or new_sl > trailing_sl:
+            trailing_sl = new_sl
+    if trailing_sl == trailing_sl and trailing_sl != 0 and price <= trailing_sl:
+        return np.nan, np.nan, -3
+
+    # BUY SIGNAL - Breakout above recent high with volume
+    volume_surge = volume > volume_avg * volume_multiplier
+    if price > recent_high:
+        if volume_surge:
+            return price, trailing_sl, 3
+        return entry_price, trailing_sl, 2
+
+    # SELL SIGNAL - Breakdown below recent low with volume
+    if price < recent_low:
+        if volume_surge:
+            return np.nan, np.nan, -3
+        return entry_price, trailing_sl, -2
+
+    return entry_price, trailing_sl, 0
+
+
+@njit(cache=True)
+def _window_atr(high, low, close, period):
+    '''
+    ATR for every bar as the ATR indicator computes it, tulip atr over the
+    last period+1 candles: mean TR (first one high-low) then one Wilder step.
+    0 until there are period+1 candles.
+    '''
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.float64)
+    for i in range(period, n):
+        s = high[i - period] - low[i - period]
+        for j in range(i - period + 1, i):
+            s += max(high[j] - low[j], abs(high[j] - close[j - 1]), abs(low[j] - close[j - 1]))
+        atr = s / period
+        tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        out[i] = (tr - atr) * (1.0 / period) + atr
+    return out
+
+
+@njit(cache=True)
+def _vol_breakout_batch(high, low, close, volume, volume_avg, atr, period, breakout_period,
+                        volume_multiplier, atr_sl_multiplier):
+    '''
+    Volume_Breakout_ATR.generate_signal over the whole history in one pass
+    '''
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    entry_price = np.nan
+    trailing_sl = np.nan
+    for i in range(max(period - 1, 1), n):
+        # breakout window excluding the current bar
+        start = max(i - breakout_period + 1, 0)
+        recent_high = high[start]
+        recent_low = low[start]
+        for j in range(start + 1, i):
+            if high[j] > recent_high:
+                recent_high = high[j]
+            if low[j] < recent_low:
+                recent_low = low[j]
+        entry_price, trailing_sl, out[i] = _vol_breakout_step(
+            close[i], volume[i], volume_avg[i], recent_high, recent_low, atr[i],
+            entry_price, trailing_sl, volume_multiplier, atr_sl_multiplier)
+    return out
 
 class Volume_Breakout_ATR(Strategy):
+    __slots__ = ('name', 'period', 'breakout_period', 'volume_multiplier', 'atr_period',
+                 'atr_sl_multiplier', 'entry_price', 'trailing_sl', '_vol_sma', '_atr_value',
+                 '_hi_dq', '_lo_dq', '_hilo_n', '_hilo_pending')
+
     config = {
         'period': {'default': 100, 'var': {'type': int, 'min': 50, 'max': 300}},
         'breakout_period': {'default': 20, 'var': {'type': int, 'min': 10, 'max': 50}},
@@ -25,60 +110,96 @@ class Volume_Breakout_ATR(Strategy):
         self.atr_period = atr_period
         self.atr_sl_multiplier = atr_sl_multiplier
 
-        self.set_indicator("SMA", 20)
-        self.set_indicator("ATR", self.atr_period)
+        self.set_indicator("SMA", 20, slot="_vol_sma")
+        self.set_indicator("ATR", self.atr_period, slot="_atr_value")
 
         self.entry_price = None
         self.trailing_sl = None
 
+        # sliding max/min of the breakout window as monotonic deques of (index, value),
+        # the window ends at the previous bar, see on_new_candle()
+        self._hi_dq = deque()
+        self._lo_dq = deque()
+        self._hilo_n = 0
+        self._hilo_pending = None
+
+    def on_new_candle(self, candle):
+        # the current bar is not part of its own breakout window, so push the previous one
+        prev = self._hilo_pending
+        self._hilo_pending = candle
+        if prev is None:
+            return
+        i = self._hilo_n
+        self._hilo_n = i + 1
+
+        hi_dq = self._hi_dq
+        high = prev.high
+        while hi_dq and hi_dq[-1][1] <= high:
+            hi_dq.pop()
+        hi_dq.append((i, high))
+
+        lo_dq = self._lo_dq
+        low = prev.low
+        while lo_dq and lo_dq[-1][1] >= low:
+            lo_dq.pop()
+        lo_dq.append((i, low))
+
+        # keep the last breakout_period - 1 bars
+        start = i - self.breakout_period + 2
+        if hi_dq[0][0] < start:
+            hi_dq.popleft()
+        if lo_dq[0][0] < start:
+            lo_dq.popleft()
+
     def generate_signal(self, candles):
         if len(candles) < self.period:
             return 0
 
-        cur_candle = candles[-1]
-        current_price = cur_candle.close
-
-        # Calculate recent high/low
-        recent_candles = candles[-self.breakout_period:]
-        recent_high = max(c.high for c in recent_candles[:-1])
-        recent_low = min(c.low for c in recent_candles[:-1])
-
-        # Get volume average
-        volume_avg = self.indicator(candles, 'SMA', 20)
-        current_volume = cur_candle.volume
+        # Recent high/low over the breakout window excluding the current bar,
+        # the deques are slid by on_new_candle()
+        self._update_ohlcv(candles)
+        current_price = float(self.closes[-1])
+        recent_high = self._hi_dq[0][1]
+        recent_low = self._lo_dq[0][1]
 
-        # Get ATR
-        atr = self.indicator(candles, 'ATR', self.atr_period)
+        # Get volume average and ATR, both slots are filled by _update_ohlcv()
+        volume_avg = self._vol_sma
+        current_volume = self.volumes[-1]
+        atr = self._atr_value
 
-        if None in [volume_avg, atr]:
+        if volume_avg is None or atr is None:
             return 0
 
-        # Update trailing SL
-        self._update_trailing_sl(current_price, atr)
-        if self.trailing_sl and current_price <= self.trailing_sl:
-            self._reset_trailing_sl()
-            return -3
-
-        # BUY SIGNAL - Breakout above recent high with volume
-        volume_surge = current_volume > volume_avg * self.volume_multiplier
-        price_breakout = current_price > recent_high
-
-        if price_breakout and volume_surge:
-            self.entry_price = current_price
-            return 3
-        elif price_breakout:
-            return 2
-
-        # SELL SIGNAL - Breakdown below recent low with volume
-        price_breakdown = current_price < recent_low
-
-        if price_breakdown and volume_surge:
-            self._reset_trailing_sl()
-            return -3
-        elif price_breakdown:
-            return -2
-
-        return 0
+        # Trailing SL and breakout checks run in one compiled step
+        entry_price = self.entry_price
+        trailing_sl = self.trailing_sl
+        entry_price, trailing_sl, signal = _vol_breakout_step(
+            current_price, current_volume, volume_avg, recent_high, recent_low, atr,
+            np.nan if entry_price is None else entry_price,
+            np.nan if trailing_sl is None else trailing_sl,
+            self.volume_multiplier, self.atr_sl_multiplier)
+        self.entry_price = None if entry_price != entry_price else entry_price
+        self.trailing_sl = None if trailing_sl != trailing_sl else trailing_sl
+        return signal
+
+    def generate_signals_batch(self, candles_arr):
+        '''
+        Signals for every candle of an OHLCV_DTYPE history, for backtesting.
+        SMA/ATR are computed over the full series the way their indicators do.
+        '''
+        close = np.ascontiguousarray(candles_arr['close'], dtype=np.float64)
+        high = np.ascontiguousarray(candles_arr['high'], dtype=np.float64)
+        low = np.ascontiguousarray(candles_arr['low'], dtype=np.float64)
+        volume = np.ascontiguousarray(candles_arr['volume'], dtype=np.float64)
+        n = close.shape[0]
+
+        # SMA indicator gives 0 until it has 'period' candles
+        volume_avg = np.zeros(n)
+        if n >= 20:
+            volume_avg[19:] = ti.sma(close, period=20)
+        atr = _window_atr(high, low, close, self.atr_period)
+        return _vol_breakout_batch(high, low, close, volume, volume_avg, atr, self.period,
+                                   self.breakout_period, self.volume_multiplier, self.atr_sl_multiplier)
 
     def _update_trailing_sl(self, current_price, atr):
         if self.entry_price is None or atr is None:
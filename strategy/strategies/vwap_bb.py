@@ -10,7 +10,122 @@
  - Mean reversion + trend following hybrid
 '''
 
+from datetime import datetime
+import math
+import numpy as np
+import tulipy as ti
 from .strategy import Strategy
+from strategy.jit import njit
+
+# generate_signal predicate bits
+_NEAR_LOWER_BB = 1 << 0
+_BOUNCING_UP = 1 << 1
+_ABOVE_VWAP = 1 << 2
+_CROSSING_VWAP = 1 << 3
+_VOLUME_HIGH = 1 << 4
+_NEAR_UPPER_BB = 1 << 5
+_TOUCHING_UPPER = 1 << 6
+_BELOW_VWAP = 1 << 7
+_CROSSING_VWAP_DOWN = 1 << 8
+_ABOVE_BB_MIDDLE = 1 << 9
+
+
+def _mask_signal(mask):
+    '''
+    Signal for a predicate mask, the buy/sell priority ladder of generate_signal.
+    A sell condition overrides the buy side.
+    '''
+    signal = 0
+
+    # === BUY SIGNAL ===
+    if mask & _BOUNCING_UP and mask & (_ABOVE_VWAP | _CROSSING_VWAP) and mask & _VOLUME_HIGH:
+        signal = 3  # Strong buy
+    elif mask & _NEAR_LOWER_BB and mask & _ABOVE_VWAP:
+        signal = 2  # Buy
+    elif mask & _CROSSING_VWAP and mask & _ABOVE_BB_MIDDLE:
+        signal = 1  # Weak buy
+
+    # === SELL SIGNAL ===
+    if mask & _TOUCHING_UPPER and mask & (_BELOW_VWAP | _CROSSING_VWAP_DOWN):
+        signal = -3  # Strong sell
+    elif mask & _NEAR_UPPER_BB:
+        signal = -2  # Sell
+    elif mask & _CROSSING_VWAP_DOWN:
+        signal = -1  # Weak sell
+
+    return signal
+
+
+@njit(cache=True)
+def _session_vwap(high, low, close, volume, day):
+    '''
+    VWAP for every bar as the VWAP indicator computes it, cumulative within a
+    day and restarted when the candle's day changes
+    '''
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.float64)
+    cur_pv = 0.0
+    cur_v = 0.0
+    cur_day = 0
+    for i in range(n):
+        if day[i] != cur_day:
+            cur_pv = 0.0
+            cur_v = 0.0
+            cur_day = day[i]
+        cur_pv += volume[i] * ((close[i] + high[i] + low[i]) / 3.0)
+        cur_v += volume[i]
+        if cur_v != 0:
+            out[i] = cur_pv / cur_v
+    return out
+
+
+@njit(cache=True)
+def _vwap_bb_batch(close, volume, volume_avg, bb_upper, bb_middle, bb_lower, vwap, signal_lut,
+                   period, one_minus_sl_frac, near_lower_factor, near_upper_factor):
+    '''
+    VWAP_BB.generate_signal over the whole history in one pass.
+    NaN stands for None in the trailing SL state.
+    '''
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    entry_price = np.nan
+    highest_price = np.nan
+    trailing_sl = np.nan
+    for i in range(max(period - 1, 1), n):
+        price = close[i]
+        prev_close = close[i - 1]
+        upper = bb_upper[i]
+        lower = bb_lower[i]
+        vw = vwap[i]
+
+        # Update trailing SL, it only moves on a new high
+        if entry_price == entry_price and (highest_price != highest_price or price > highest_price):
+            highest_price = price
+            trailing_sl = price * one_minus_sl_frac
+        if trailing_sl == trailing_sl and trailing_sl != 0 and price <= trailing_sl:
+            entry_price = highest_price = trailing_sl = np.nan
+            out[i] = -3
+            continue
+
+        volume_high = volume_avg[i] != 0 and volume[i] > volume_avg[i] * 1.3
+        mask = ((price <= lower * near_lower_factor) |
+                ((prev_close < lower and price >= lower) << 1) |
+                ((price > vw) << 2) |
+                ((prev_close <= vw and price > vw) << 3) |
+                (volume_high << 4) |
+                ((price >= upper * near_upper_factor) << 5) |
+                ((price >= upper) << 6) |
+                ((price < vw) << 7) |
+                ((prev_close >= vw and price < vw) << 8) |
+                ((price > bb_middle[i]) << 9))
+        signal = signal_lut[mask]
+        if signal >= 2:
+            entry_price = highest_price = price
+            trailing_sl = price * one_minus_sl_frac
+        elif signal <= -2:
+            entry_price = highest_price = trailing_sl = np.nan
+        out[i] = signal
+    return out
 
 
 class VWAP_BB(Strategy):
@@ -27,6 +142,18 @@ class VWAP_BB(Strategy):
     - Price below VWAP
     """
 
+    __slots__ = ('name', 'period', 'bb_period', 'bb_std', 'trailing_sl_percent', '_one_minus_sl_frac',
+                 '_vwap', '_vol_sma', 'entry_price', 'highest_price', 'trailing_sl',
+                 '_bb_ring', '_bb_idx', '_bb_n', '_bb_mean', '_bb_m2')
+
+    # signal for every predicate mask, replaces the if/elif ladder per bar
+    _SIGNAL_LUT = tuple(_mask_signal(mask) for mask in range(1 << 10))
+    _SIGNAL_LUT_ARR = np.array(_SIGNAL_LUT, dtype=np.int8)
+
+    # price within 2% of the lower/upper band counts as near it
+    _near_lower_factor = 1.02
+    _near_upper_factor = 0.98
+
     config = {
         'period': {
             'default': 100,
@@ -54,37 +181,66 @@ class VWAP_BB(Strategy):
         self.bb_period = bb_period
         self.bb_std = bb_std
         self.trailing_sl_percent = trailing_sl_percent
+        self._one_minus_sl_frac = 1.0 - trailing_sl_percent / 100.0
 
         # Register indicators
-        self.set_indicator("BB", self.bb_period)
-        self.set_indicator("VWAP", 0)
-        self.set_indicator("SMA", 20)
+        self.set_indicator("VWAP", 0, slot="_vwap")
+        self.set_indicator("SMA", 20, slot="_vol_sma")
 
         # Trailing SL state
         self.entry_price = None
         self.highest_price = None
         self.trailing_sl = None
 
+        # Bollinger Bands over the last bb_period closes, kept incrementally by on_new_candle()
+        self._bb_ring = np.zeros(bb_period, dtype=np.float64)
+        self._bb_idx = 0
+        self._bb_n = 0
+        self._bb_mean = 0.0
+        self._bb_m2 = 0.0
+
+    def on_new_candle(self, candle):
+        """Slide the BB window by one close, O(1) Welford add/replace update"""
+        x = candle.close
+        ring = self._bb_ring
+        idx = self._bb_idx
+        mean = self._bb_mean
+        if self._bb_n < self.bb_period:
+            self._bb_n = n = self._bb_n + 1
+            self._bb_mean = new_mean = mean + (x - mean) / n
+            self._bb_m2 += (x - mean) * (x - new_mean)
+        else:
+            old = float(ring[idx])
+            self._bb_mean = new_mean = mean + (x - old) / self.bb_period
+            self._bb_m2 += (x - old) * (x - new_mean + old - mean)
+        ring[idx] = x
+        self._bb_idx = (idx + 1) % self.bb_period
+
+    def _bb_inc_latest(self):
+        """(upper, middle, lower) band as of the last candle, None until bb_period closes are in"""
+        if self._bb_n < self.bb_period:
+            return None
+        mean = self._bb_mean
+        width = self.bb_std * math.sqrt(max(self._bb_m2 / self.bb_period, 0.0))
+        return mean + width, mean, mean - width
+
     def generate_signal(self, candles):
         """Generate trading signal"""
         if len(candles) < self.period:
             return 0
 
-        cur_candle = candles[-1]
-        prev_candle = candles[-2] if len(candles) > 1 else None
+        self._update_ohlcv(candles)
 
-        # Get indicators
-        bb = self.indicator(candles, 'BB', self.bb_period)
-        vwap = self.indicator(candles, 'VWAP', 0)
-        volume_avg = self.indicator(candles, 'SMA', 20)
+        # Get indicators, the slots and BB state are updated by _update_ohlcv()
+        bb = self._bb_inc_latest()
+        vwap = self._vwap
+        volume_avg = self._vol_sma
 
-        if None in [bb, vwap]:
+        if bb is None or vwap is None:
             return 0
 
-        current_price = cur_candle.close
-        bb_upper = bb['upper']
-        bb_middle = bb['middle']
-        bb_lower = bb['lower']
+        prev_close, current_price = self.closes[-2:].tolist()
+        bb_upper, bb_middle, bb_lower = bb
 
         # Update trailing SL
         self._update_trailing_sl(current_price)
@@ -94,61 +250,66 @@ class VWAP_BB(Strategy):
             self._reset_trailing_sl()
             return -3
 
-        signal = 0
-
-        # === BUY SIGNAL ===
-        # Price bouncing from lower BB
-        near_lower_bb = current_price <= bb_lower * 1.02
-        bouncing_up = prev_candle and prev_candle.close < bb_lower and current_price >= bb_lower
-
-        # VWAP confirmation
-        above_vwap = current_price > vwap
-        crossing_vwap = prev_candle and prev_candle.close <= vwap and current_price > vwap
-
-        # Volume confirmation
-        volume_high = cur_candle.volume > volume_avg * 1.3 if volume_avg else False
-
-        if bouncing_up and (above_vwap or crossing_vwap) and volume_high:
-            signal = 3  # Strong buy
+        # Predicate mask, see _mask_signal() for the priority ladder
+        volume_high = float(self.volumes[-1]) > volume_avg * 1.3 if volume_avg else False
+        mask = ((current_price <= bb_lower * self._near_lower_factor) |
+                ((prev_close < bb_lower and current_price >= bb_lower) << 1) |
+                ((current_price > vwap) << 2) |
+                ((prev_close <= vwap and current_price > vwap) << 3) |
+                (volume_high << 4) |
+                ((current_price >= bb_upper * self._near_upper_factor) << 5) |
+                ((current_price >= bb_upper) << 6) |
+                ((current_price < vwap) << 7) |
+                ((prev_close >= vwap and current_price < vwap) << 8) |
+                ((current_price > bb_middle) << 9))
+        signal = self._SIGNAL_LUT[mask]
+
+        if signal >= 2:
             self.entry_price = current_price
             self.highest_price = current_price
-        elif near_lower_bb and above_vwap:
-            signal = 2  # Buy
-            self.entry_price = current_price
-            self.highest_price = current_price
-        elif crossing_vwap and current_price > bb_middle:
-            signal = 1  # Weak buy
-
-        # === SELL SIGNAL ===
-        # Price at upper BB
-        near_upper_bb = current_price >= bb_upper * 0.98
-        touching_upper = current_price >= bb_upper
-
-        # VWAP confirmation
-        below_vwap = current_price < vwap
-        crossing_vwap_down = prev_candle and prev_candle.close >= vwap and current_price < vwap
-
-        if touching_upper and (below_vwap or crossing_vwap_down):
-            signal = -3  # Strong sell
-            self._reset_trailing_sl()
-        elif near_upper_bb:
-            signal = -2  # Sell
+            self.trailing_sl = current_price * self._one_minus_sl_frac
+        elif signal <= -2:
             self._reset_trailing_sl()
-        elif crossing_vwap_down:
-            signal = -1  # Weak sell
 
         return signal
 
+    def generate_signals_batch(self, candles_arr):
+        '''
+        Signals for every candle of an OHLCV_DTYPE history, for backtesting.
+        BB, VWAP and the SMA are computed over the full series in one go.
+        '''
+        close = np.ascontiguousarray(candles_arr['close'], dtype=np.float64)
+        high = np.ascontiguousarray(candles_arr['high'], dtype=np.float64)
+        low = np.ascontiguousarray(candles_arr['low'], dtype=np.float64)
+        volume = np.ascontiguousarray(candles_arr['volume'], dtype=np.float64)
+        n = close.shape[0]
+
+        bb_upper = np.full(n, np.nan)
+        bb_middle = np.full(n, np.nan)
+        bb_lower = np.full(n, np.nan)
+        if n >= self.bb_period:
+            k = self.bb_period - 1
+            bb_lower[k:], bb_middle[k:], bb_upper[k:] = ti.bbands(close, period=self.bb_period,
+                                                                  stddev=self.bb_std)
+        # SMA indicator gives 0 until it has 'period' candles
+        volume_avg = np.zeros(n)
+        if n >= 20:
+            volume_avg[19:] = ti.sma(close, period=20)
+        day = np.array([datetime.fromtimestamp(t).day for t in candles_arr['time'].tolist()], dtype=np.int64)
+        vwap = _session_vwap(high, low, close, volume, day)
+
+        return _vwap_bb_batch(close, volume, volume_avg, bb_upper, bb_middle, bb_lower, vwap,
+                              self._SIGNAL_LUT_ARR, self.period, self._one_minus_sl_frac,
+                              self._near_lower_factor, self._near_upper_factor)
+
     def _update_trailing_sl(self, current_price):
-        """Update trailing stop loss"""
+        """Update trailing stop loss, it only moves when a new high is made"""
         if self.entry_price is None:
             return
 
         if self.highest_price is None or current_price > self.highest_price:
             self.highest_price = current_price
-
-        sl_distance = self.highest_price * (self.trailing_sl_percent / 100)
-        self.trailing_sl = self.highest_price - sl_distance
+            self.trailing_sl = current_price * self._one_minus_sl_frac
 
     def _reset_trailing_sl(self):
         """Reset trailing stop loss"""
@@ -9,13 +9,14 @@ from typing import Dict, Any, Optional
 from utils import getLogger
 
 log = getLogger('StrategyLogger')
-log.setLevel(log.DEBUG)
 
 
 class StrategyLogger:
     """
-    Helper class for strategies to log indicators and signals to InfluxDB
+    Helper class for strategies to log indicators and signals to InfluxDB,
+    the latest indicator values are also cached in Redis
     """
+    __slots__ = ('strategy_name', 'exchange', 'product', 'indicator_logger', '_enabled', 'redis')
     
     def __init__(self, strategy_name: str, exchange: str, product: str):
         """
@@ -30,17 +31,24 @@ class StrategyLogger:
         self.exchange = exchange
         self.product = product
         self.indicator_logger = None
+        self._enabled = False
+        self.redis = None
         
         # Try to get indicator logger
         try:
-            from db import get_indicator_logger
+            from db import get_indicator_logger, get_redis_cache
+            redis = get_redis_cache()
+            if redis and redis.is_enabled():
+                self.redis = redis
             self.indicator_logger = get_indicator_logger()
-            if self.indicator_logger and self.indicator_logger.is_enabled():
-                log.info(f"Strategy logger enabled for {strategy_name}")
+            # checked once here, the log_* calls run every tick
+            self._enabled = bool(self.indicator_logger and self.indicator_logger.is_enabled())
+            if self._enabled:
+                log.info("Strategy logger enabled for %s", strategy_name)
             else:
-                log.debug(f"Indicator logging not available for {strategy_name}")
+                log.debug("Indicator logging not available for %s", strategy_name)
         except Exception as e:
-            log.debug(f"Could not initialize indicator logger: {e}")
+            log.debug("Could not initialize indicator logger: %s", e)
     
     def log_indicators(self, timestamp: int, indicators: Dict[str, Any],
                       signal: Optional[Dict[str, Any]] = None) -> bool:
@@ -71,7 +79,12 @@ class StrategyLogger:
                 }
             )
         """
-        if not self.indicator_logger:
+        # latest values also go to the Redis cache, one pipelined write per call
+        if self.redis:
+            self.redis.cache_strategy_indicators(self.exchange, self.product, self.strategy_name,
+                                                 indicators)
+        
+        if not self._enabled:
             return False
         
         return self.indicator_logger.log_indicators(
@@ -108,7 +121,7 @@ class StrategyLogger:
                 metadata={'price': 44500, 'volume': 1500}
             )
         """
-        if not self.indicator_logger:
+        if not self._enabled:
             return False
         
         return self.indicator_logger.log_strategy_signal(
@@ -144,7 +157,7 @@ class StrategyLogger:
                 }
             )
         """
-        if not self.indicator_logger:
+        if not self._enabled:
             return False
         
         return self.indicator_logger.log_strategy_performance(
@@ -6,6 +6,7 @@ Test script to verify InfluxDB and Redis connectivity and data storage
 
 import sys
 import time
+import asyncio
 from datetime import datetime
 
 print("=" * 60)
@@ -80,7 +81,8 @@ if influx.is_enabled():
     if success:
         print("   ✓ InfluxDB write working")
         
-        # Test read
+        # Test read, candle writes are batched so push them out first
+        influx.flush()
         time.sleep(1)  # Give InfluxDB time to index
         candles = influx.query_candles(
             exchange='papertrader',
@@ -103,26 +105,29 @@ else:
 # Test 4: Test CandleDBInflux
 print("\n4. Testing CandleDBInflux...")
 try:
-    from db.influx_db import init_influx_db
-    from db.redis_cache import init_redis_cache
+    from db.influx_db import init_influx_db_async, get_influx_db
+    from db.redis_cache import init_redis_cache_async
     from db.candle_db_influx import CandleDBInflux
     from market import OHLC
     
-    # Initialize global instances
-    init_redis_cache({
-        'host': 'localhost',
-        'port': 6379,
-        'db': 0,
-        'enabled': True
-    })
+    # Initialize global instances, both connects run concurrently
+    async def init_globals():
+        await asyncio.gather(
+            init_redis_cache_async({
+                'host': 'localhost',
+                'port': 6379,
+                'db': 0,
+                'enabled': True
+            }),
+            init_influx_db_async({
+                'url': 'http://localhost:8086',
+                'token': 'wolfinch-super-secret-token-change-in-production',
+                'org': 'wolfinch',
+                'bucket': 'trading',
+                'enabled': True
+            }))
     
-    init_influx_db({
-        'url': 'http://localhost:8086',
-        'token': 'wolfinch-super-secret-token-change-in-production',
-        'org': 'wolfinch',
-        'bucket': 'trading',
-        'enabled': True
-    })
+    asyncio.run(init_globals())
     
     candle_db = CandleDBInflux('papertrader', 'TEST-PRODUCT', OHLC)
     
@@ -147,6 +152,7 @@ try:
             print("   ✗ Candle save failed")
         
         # Query candles
+        get_influx_db().flush()
         time.sleep(1)
         candles = candle_db.db_get_recent_candles(10)
         print(f"   ✓ Retrieved {len(candles)} candles")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 """Test initialization sequence"""
 
+import asyncio
 import yaml
 
 print("Testing initialization sequence...")
@@ -30,22 +31,29 @@ except Exception as e:
     traceback.print_exc()
     exit(1)
 
-# Step 2: Initialize Redis
-print("\n2. Initializing Redis...")
+# Step 2: Initialize Redis and InfluxDB, both connects run concurrently
+print("\n2. Initializing Redis and InfluxDB...")
+from db import init_redis_cache_async, init_influx_db_async, get_influx_db
+
+async def init_cache_dbs():
+    return await asyncio.gather(init_redis_cache_async(redis_config),
+                                init_influx_db_async(influx_config),
+                                return_exceptions=True)
+
+redis_cache, influx_db = asyncio.run(init_cache_dbs())
+
 try:
-    from db import init_redis_cache
-    redis_cache = init_redis_cache(redis_config)
+    if isinstance(redis_cache, Exception):
+        raise redis_cache
     print(f"   ✓ Redis initialized: {redis_cache.is_enabled()}")
 except Exception as e:
     print(f"   ✗ Error: {e}")
     import traceback
     traceback.print_exc()
 
-# Step 3: Initialize InfluxDB
-print("\n3. Initializing InfluxDB...")
 try:
-    from db import init_influx_db, get_influx_db
-    influx_db = init_influx_db(influx_config)
+    if isinstance(influx_db, Exception):
+        raise influx_db
     print(f"   ✓ InfluxDB initialized: {influx_db.is_enabled()}")
     
     # Verify global instance
@@ -58,8 +66,8 @@ except Exception as e:
     traceback.print_exc()
     exit(1)
 
-# Step 4: Initialize Trade Logger
-print("\n4. Initializing Trade Logger...")
+# Step 3: Initialize Trade Logger
+print("\n3. Initializing Trade Logger...")
 try:
     from db import init_trade_logger, get_trade_logger
     trade_logger = init_trade_logger()
@@ -75,8 +83,8 @@ except Exception as e:
     import traceback
     traceback.print_exc()
 
-# Step 5: Test CandlesDb
-print("\n5. Testing CandlesDb...")
+# Step 4: Test CandlesDb
+print("\n4. Testing CandlesDb...")
 try:
     from db import CandlesDb
     from market import OHLC
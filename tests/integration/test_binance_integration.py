@@ -8,18 +8,102 @@ Tests the complete Binance integration including:
 - Error handling
 """
 
+import os
 import pytest
+from contextlib import ExitStack
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 from decimal import Decimal
 
 # Import the Binance client
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
-
 from exchanges.binanceClient.binanceClient import Binance
 from market.order import Order, TradeRequest
 
+# everything is mocked, the file can run on its own xdist worker
+pytestmark = pytest.mark.xdist_group("binance_mocks")
+
+# exchange section of config/binance.yml as readConf() returns it, one per test class
+_BINANCE_PRODUCTS = (MappingProxyType({'BTCUSDT': MappingProxyType({'id': 'BTC-USD'})}),)
+
+_BINANCE_CONF_INIT = MappingProxyType({
+    'apiKey': 'test_key',
+    'apiSecret': 'test_secret',
+    'test_mode': True,
+    'products': _BINANCE_PRODUCTS,
+    'backfill_enabled': True,
+    'backfill_period': 7,
+    'backfill_interval': '5m'
+})
+
+_BINANCE_CONF_TRADING = MappingProxyType({
+    'apiKey': 'test_key',
+    'apiSecret': 'test_secret',
+    'test_mode': True,
+    'products': _BINANCE_PRODUCTS,
+    'backfill_enabled': False
+})
+
+_BINANCE_CONF_MARKETDATA = MappingProxyType({
+    'apiKey': 'test_key',
+    'apiSecret': 'test_secret',
+    'products': _BINANCE_PRODUCTS,
+    'backfill_enabled': False
+})
+
+
+def _binance_conf(exchange):
+    """readConf() result for one of the above. Binance() writes its backfill settings into the section, so it gets a copy"""
+    return {'exchange': dict(exchange)}
+
+
+# product the trade requests point at, only get_name() is called on it
+_MOCK_PRODUCT = SimpleNamespace(get_name=lambda: 'BTC-USD')
+
+# Binance API payloads the mocked clients hand back, the client code only reads them
+_BUY_RESP = MappingProxyType({
+    'orderId': '12345',
+    'status': 'FILLED',
+    'executedQty': '0.1',
+    'price': '50000',
+    'transactTime': 1234567890
+})
+
+_SELL_RESP = MappingProxyType({
+    'orderId': '12346',
+    'status': 'FILLED',
+    'executedQty': '0.1',
+    'price': '51000',
+    'transactTime': 1234567891
+})
+
+_CANCEL_RESP = MappingProxyType({
+    'orderId': '12345',
+    'status': 'CANCELED'
+})
+
+_GET_ORDER_RESP = MappingProxyType({
+    'orderId': '12345',
+    'status': 'FILLED',
+    'type': 'MARKET',
+    'side': 'BUY',
+    'origQty': '0.1',
+    'executedQty': '0.1',
+    'price': '50000',
+    'time': 1234567890,
+    'updateTime': 1234567891
+})
+
+_TICKER_RESP = MappingProxyType({
+    'symbol': 'BTCUSDT',
+    'lastPrice': '50000',
+    'volume': '1000'
+})
+
+_BOOK_RESP = MappingProxyType({
+    'bids': (('50000', '1.0'),),
+    'asks': (('50100', '1.0'),)
+})
+
 
 class TestBinanceConnection:
     """Test Binance connection and initialization"""
@@ -41,17 +125,7 @@ class TestBinanceConnection:
     def test_binance_initialization(self, mock_readConf, mock_client, binance_config):
         """Test Binance client initialization"""
         # Mock configuration
-        mock_readConf.return_value = {
-            'exchange': {
-                'apiKey': 'test_key',
-                'apiSecret': 'test_secret',
-                'test_mode': True,
-                'products': [{'BTCUSDT': {'id': 'BTC-USD'}}],
-                'backfill_enabled': True,
-                'backfill_period': 7,
-                'backfill_interval': '5m'
-            }
-        }
+        mock_readConf.return_value = _binance_conf(_BINANCE_CONF_INIT)
         
         # Mock Binance client
         mock_client_instance = MagicMock()
@@ -79,56 +153,42 @@ class TestBinanceConnection:
 class TestBinanceTrading:
     """Test Binance trading operations"""
     
-    @pytest.fixture
-    def mock_binance(self):
-        """Create a mock Binance instance"""
-        with patch('exchanges.binanceClient.binanceClient.Client'):
-            with patch('exchanges.binanceClient.binanceClient.readConf') as mock_conf:
-                mock_conf.return_value = {
-                    'exchange': {
-                        'apiKey': 'test_key',
-                        'apiSecret': 'test_secret',
-                        'test_mode': True,
-                        'products': [{'BTCUSDT': {'id': 'BTC-USD'}}],
-                        'backfill_enabled': False
-                    }
-                }
-                config = {
-                    'config': 'config/binance.yml',
-                    'candle_interval': 300,
-                    'backfill': {'enabled': False, 'period': 7}
-                }
-                binance = Binance(config)
-                binance.binance_products = [{
-                    'id': 'BTC-USD',
-                    'symbol': 'BTCUSDT',
-                    'baseAsset': 'BTC',
-                    'quoteAsset': 'USDT'
-                }]
-                return binance
+    @pytest.fixture(scope="class")
+    def mock_binance(self, request):
+        """Create a mock Binance instance, built once for the class"""
+        stack = ExitStack()
+        request.addfinalizer(stack.close)
+        stack.enter_context(patch('exchanges.binanceClient.binanceClient.Client'))
+        mock_conf = stack.enter_context(patch('exchanges.binanceClient.binanceClient.readConf'))
+        mock_conf.return_value = _binance_conf(_BINANCE_CONF_TRADING)
+        config = {
+            'config': 'config/binance.yml',
+            'candle_interval': 300,
+            'backfill': {'enabled': False, 'period': 7}
+        }
+        binance = Binance(config)
+        binance.binance_products = [{
+            'id': 'BTC-USD',
+            'symbol': 'BTCUSDT',
+            'baseAsset': 'BTC',
+            'quoteAsset': 'USDT'
+        }]
+        return binance
+    
+    @pytest.fixture(autouse=True)
+    def _reset_binance(self, mock_binance):
+        """Fresh clients for every test, the Binance instance is shared"""
+        mock_binance.auth_client = Mock()
+        mock_binance.public_client = Mock()
     
     def test_buy_order(self, mock_binance):
         """Test placing a buy order"""
-        # Mock product
-        mock_product = Mock()
-        mock_product.get_name.return_value = 'BTC-USD'
-        
-        # Mock trade request
-        trade_req = Mock()
-        trade_req.product = mock_product
-        trade_req.size = 0.1
-        trade_req.price = 50000
-        trade_req.type = 'MARKET'
+        # Trade request, buy()/sell() only read its attributes
+        trade_req = SimpleNamespace(product=_MOCK_PRODUCT, size=0.1, price=50000, type='MARKET')
         
         # Mock auth client response
         mock_binance.auth_client = Mock()
-        mock_binance.auth_client.order_market_buy.return_value = {
-            'orderId': '12345',
-            'status': 'FILLED',
-            'executedQty': '0.1',
-            'price': '50000',
-            'transactTime': 1234567890
-        }
+        mock_binance.auth_client.order_market_buy.return_value = _BUY_RESP
         
         # Place buy order
         order = mock_binance.buy(trade_req)
@@ -141,26 +201,12 @@ class TestBinanceTrading:
     
     def test_sell_order(self, mock_binance):
         """Test placing a sell order"""
-        # Mock product
-        mock_product = Mock()
-        mock_product.get_name.return_value = 'BTC-USD'
-        
-        # Mock trade request
-        trade_req = Mock()
-        trade_req.product = mock_product
-        trade_req.size = 0.1
-        trade_req.price = 51000
-        trade_req.type = 'MARKET'
+        # Trade request, buy()/sell() only read its attributes
+        trade_req = SimpleNamespace(product=_MOCK_PRODUCT, size=0.1, price=51000, type='MARKET')
         
         # Mock auth client response
         mock_binance.auth_client = Mock()
-        mock_binance.auth_client.order_market_sell.return_value = {
-            'orderId': '12346',
-            'status': 'FILLED',
-            'executedQty': '0.1',
-            'price': '51000',
-            'transactTime': 1234567891
-        }
+        mock_binance.auth_client.order_market_sell.return_value = _SELL_RESP
         
         # Place sell order
         order = mock_binance.sell(trade_req)
@@ -175,10 +221,7 @@ class TestBinanceTrading:
         """Test canceling an order"""
         # Mock auth client response
         mock_binance.auth_client = Mock()
-        mock_binance.auth_client.cancel_order.return_value = {
-            'orderId': '12345',
-            'status': 'CANCELED'
-        }
+        mock_binance.auth_client.cancel_order.return_value = _CANCEL_RESP
         
         # Cancel order
         result = mock_binance.cancel_order('BTC-USD', '12345')
@@ -190,17 +233,7 @@ class TestBinanceTrading:
         """Test getting order status"""
         # Mock auth client response
         mock_binance.auth_client = Mock()
-        mock_binance.auth_client.get_order.return_value = {
-            'orderId': '12345',
-            'status': 'FILLED',
-            'type': 'MARKET',
-            'side': 'BUY',
-            'origQty': '0.1',
-            'executedQty': '0.1',
-            'price': '50000',
-            'time': 1234567890,
-            'updateTime': 1234567891
-        }
+        mock_binance.auth_client.get_order.return_value = _GET_ORDER_RESP
         
         # Get order
         order = mock_binance.get_order('BTC-USD', '12345')
@@ -214,40 +247,37 @@ class TestBinanceTrading:
 class TestBinanceMarketData:
     """Test Binance market data operations"""
     
-    @pytest.fixture
-    def mock_binance(self):
-        """Create a mock Binance instance"""
-        with patch('exchanges.binanceClient.binanceClient.Client'):
-            with patch('exchanges.binanceClient.binanceClient.readConf') as mock_conf:
-                mock_conf.return_value = {
-                    'exchange': {
-                        'apiKey': 'test_key',
-                        'apiSecret': 'test_secret',
-                        'products': [{'BTCUSDT': {'id': 'BTC-USD'}}],
-                        'backfill_enabled': False
-                    }
-                }
-                config = {
-                    'config': 'config/binance.yml',
-                    'candle_interval': 300,
-                    'backfill': {'enabled': False, 'period': 7}
-                }
-                binance = Binance(config)
-                binance.binance_products = [{
-                    'id': 'BTC-USD',
-                    'symbol': 'BTCUSDT'
-                }]
-                return binance
+    @pytest.fixture(scope="class")
+    def mock_binance(self, request):
+        """Create a mock Binance instance, built once for the class"""
+        stack = ExitStack()
+        request.addfinalizer(stack.close)
+        stack.enter_context(patch('exchanges.binanceClient.binanceClient.Client'))
+        mock_conf = stack.enter_context(patch('exchanges.binanceClient.binanceClient.readConf'))
+        mock_conf.return_value = _binance_conf(_BINANCE_CONF_MARKETDATA)
+        config = {
+            'config': 'config/binance.yml',
+            'candle_interval': 300,
+            'backfill': {'enabled': False, 'period': 7}
+        }
+        binance = Binance(config)
+        binance.binance_products = [{
+            'id': 'BTC-USD',
+            'symbol': 'BTCUSDT'
+        }]
+        return binance
+    
+    @pytest.fixture(autouse=True)
+    def _reset_binance(self, mock_binance):
+        """Fresh clients for every test, the Binance instance is shared"""
+        mock_binance.auth_client = Mock()
+        mock_binance.public_client = Mock()
     
     def test_get_ticker(self, mock_binance):
         """Test getting ticker data"""
         # Mock public client response
         mock_binance.public_client = Mock()
-        mock_binance.public_client.get_ticker.return_value = {
-            'symbol': 'BTCUSDT',
-            'lastPrice': '50000',
-            'volume': '1000'
-        }
+        mock_binance.public_client.get_ticker.return_value = _TICKER_RESP
         
         # Get ticker
         ticker = mock_binance.get_ticker('BTC-USD')
@@ -260,10 +290,7 @@ class TestBinanceMarketData:
         """Test getting order book"""
         # Mock public client response
         mock_binance.public_client = Mock()
-        mock_binance.public_client.get_order_book.return_value = {
-            'bids': [['50000', '1.0']],
-            'asks': [['50100', '1.0']]
-        }
+        mock_binance.public_client.get_order_book.return_value = _BOOK_RESP
         
         # Get order book
         order_book = mock_binance.get_order_book_depth('BTC-USD', 100)
@@ -275,19 +302,18 @@ class TestBinanceMarketData:
 
 
 @pytest.mark.integration
+@pytest.mark.skipif(not os.getenv("RUN_LIVE"), reason="Requires live Binance testnet credentials")
 class TestBinanceLiveIntegration:
     """
     Live integration tests (requires actual Binance testnet credentials)
-    Run with: pytest -m integration
+    Run with: RUN_LIVE=1 pytest -m integration
     """
     
-    @pytest.mark.skip(reason="Requires live Binance testnet credentials")
     def test_live_connection(self):
         """Test live connection to Binance testnet"""
         # This would test actual connection to Binance testnet
         pass
     
-    @pytest.mark.skip(reason="Requires live Binance testnet credentials")
     def test_live_market_data(self):
         """Test retrieving live market data"""
         # This would test actual market data retrieval
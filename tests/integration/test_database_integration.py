@@ -8,13 +8,41 @@ Tests integration with:
 - Kafka
 """
 
+import os
 import pytest
+from contextlib import ExitStack
 from unittest.mock import Mock, patch, MagicMock
 import time
 
-import sys
-import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+import db.influx_db
+import db.postgres_logger
+import db.redis_cache
+import infra.kafka.kafka_producer
+
+# everything is mocked, the file can run on its own xdist worker
+pytestmark = pytest.mark.xdist_group("db_mocks")
+
+# client classes patched for the whole module, see _db_mocks
+DB_PATCH_TARGETS = {
+    'InfluxDBClient': 'db.influx_db.InfluxDBClient',
+    'SimpleConnectionPool': 'db.postgres_logger.psycopg2.pool.SimpleConnectionPool',
+    'Redis': 'db.redis_cache.redis.Redis',
+    'KafkaProducer': 'infra.kafka.kafka_producer.KafkaProducer',
+}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _db_mocks():
+    """Patch the db client classes once for the module, yields the mocks by name"""
+    with ExitStack() as stack:
+        yield {name: stack.enter_context(patch(target)) for name, target in DB_PATCH_TARGETS.items()}
+
+
+@pytest.fixture(autouse=True)
+def _reset_db_mocks(_db_mocks):
+    """Clean mocks for every test"""
+    for mock in _db_mocks.values():
+        mock.reset_mock(return_value=True, side_effect=True)
 
 
 class TestInfluxDBIntegration:
@@ -31,9 +59,9 @@ class TestInfluxDBIntegration:
             'enabled': True
         }
     
-    @patch('db.influx_db.InfluxDBClient')
-    def test_influxdb_connection(self, mock_client, mock_influx_config):
+    def test_influxdb_connection(self, _db_mocks, mock_influx_config):
         """Test InfluxDB connection"""
+        mock_client = _db_mocks['InfluxDBClient']
         from db.influx_db import InfluxDB
         
         # Mock client
@@ -92,9 +120,9 @@ class TestPostgreSQLIntegration:
             'password': 'wolfinch2024'
         }
     
-    @patch('db.postgres_logger.psycopg2.pool.SimpleConnectionPool')
-    def test_postgres_connection(self, mock_pool, mock_postgres_config):
+    def test_postgres_connection(self, _db_mocks, mock_postgres_config):
         """Test PostgreSQL connection"""
+        mock_pool = _db_mocks['SimpleConnectionPool']
         from db.postgres_logger import PostgresLogger
         
         # Mock connection pool
@@ -108,9 +136,9 @@ class TestPostgreSQLIntegration:
         assert logger is not None
         assert logger.is_enabled() is True
     
-    @patch('db.postgres_logger.psycopg2.pool.SimpleConnectionPool')
-    def test_log_trade(self, mock_pool, mock_postgres_config):
+    def test_log_trade(self, _db_mocks, mock_postgres_config):
         """Test logging a trade to PostgreSQL"""
+        mock_pool = _db_mocks['SimpleConnectionPool']
         from db.postgres_logger import PostgresLogger
         
         # Mock connection pool and connection
@@ -157,9 +185,9 @@ class TestRedisIntegration:
             'enabled': True
         }
     
-    @patch('db.redis_cache.redis.Redis')
-    def test_redis_connection(self, mock_redis, mock_redis_config):
+    def test_redis_connection(self, _db_mocks, mock_redis_config):
         """Test Redis connection"""
+        mock_redis = _db_mocks['Redis']
         from db.redis_cache import RedisCache
         
         # Mock Redis client
@@ -173,9 +201,9 @@ class TestRedisIntegration:
         # Assertions
         assert cache is not None
     
-    @patch('db.redis_cache.redis.Redis')
-    def test_cache_operations(self, mock_redis, mock_redis_config):
+    def test_cache_operations(self, _db_mocks, mock_redis_config):
         """Test Redis cache operations"""
+        mock_redis = _db_mocks['Redis']
         from db.redis_cache import RedisCache
         
         # Mock Redis client
@@ -205,9 +233,9 @@ class TestKafkaIntegration:
             'enabled': True
         }
     
-    @patch('infra.kafka.kafka_producer.KafkaProducer')
-    def test_kafka_connection(self, mock_producer):
+    def test_kafka_connection(self, _db_mocks):
         """Test Kafka producer connection"""
+        mock_producer = _db_mocks['KafkaProducer']
         from infra.kafka.kafka_producer import WolfinchKafkaProducer
         
         # Mock Kafka producer
@@ -221,9 +249,9 @@ class TestKafkaIntegration:
         assert producer is not None
         assert producer.enabled is True
     
-    @patch('infra.kafka.kafka_producer.KafkaProducer')
-    def test_publish_event(self, mock_producer):
+    def test_publish_event(self, _db_mocks):
         """Test publishing event to Kafka"""
+        mock_producer = _db_mocks['KafkaProducer']
         from infra.kafka.kafka_producer import WolfinchKafkaProducer
         
         # Mock Kafka producer
@@ -252,19 +280,18 @@ class TestKafkaIntegration:
 
 
 @pytest.mark.integration
+@pytest.mark.skipif(not os.getenv("RUN_LIVE"), reason="Requires running databases")
 class TestFullDatabaseIntegration:
     """
     Full integration tests with actual databases
-    Run with: pytest -m integration
+    Run with: RUN_LIVE=1 pytest -m integration
     """
     
-    @pytest.mark.skip(reason="Requires running databases")
     def test_full_logging_pipeline(self):
         """Test complete logging pipeline across all databases"""
         # This would test actual logging to all systems
         pass
     
-    @pytest.mark.skip(reason="Requires running databases")
     def test_data_consistency(self):
         """Test data consistency across databases"""
         # This would verify data is consistent across InfluxDB, PostgreSQL, and Kafka
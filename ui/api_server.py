@@ -5,36 +5,97 @@
  Copyright: (c) 2024 Wolfinch Contributors
 '''
 
-import json
 import os
+
+# Websockets are served on gevent greenlets, not one OS thread per client. Patching has to
+# happen before the rest is imported. Threads are left unpatched, so the locks and worker
+# threads shared with the bot stay real. WOLFINCH_API_ASYNC_MODE=threading restores the
+# thread-per-client server.
+ASYNC_MODE = os.environ.get('WOLFINCH_API_ASYNC_MODE', 'gevent')
+if ASYNC_MODE == 'gevent':
+    try:
+        from gevent import monkey
+        monkey.patch_all(thread=False)
+        import gevent
+    except ImportError:
+        ASYNC_MODE = 'threading'
+
+import json
+import time
+import heapq
+import signal
+import hashlib
+import threading
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify, session, render_template_string, send_from_directory
+import numpy as np
+from flask import Flask, Response, g, request, jsonify, session, render_template_string
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_socketio import SocketIO, emit, join_room, leave_room
-from functools import wraps
+from functools import lru_cache, wraps
+from operator import attrgetter, itemgetter
 
 from utils import getLogger
-from .auth import get_user_manager, User
+from .auth import get_user_manager, User, ROLE_ADMIN
 from risk import get_risk_manager
 
 log = getLogger('APIServer')
 log.setLevel(log.INFO)
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+    log.warning("flask-compress not available, API responses go out uncompressed. Install with: pip install flask-compress brotli")
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    DefaultJSONProvider = None  # Flask < 2.2, jsonify stays on stdlib json
+
+if ORJSON_AVAILABLE and DefaultJSONProvider:
+    class OrjsonProvider(DefaultJSONProvider):
+        """jsonify through orjson, types orjson doesn't know go through Flask's default()"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=self.default,
+                                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
 # Flask app
 app = Flask(__name__, static_folder='web_enhanced', static_url_path='/static')
+if ORJSON_AVAILABLE and DefaultJSONProvider:
+    app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'wolfinch-secret-key-change-in-production'
 app.config['SESSION_COOKIE_SECURE'] = False  # Set True in production with HTTPS
 app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(hours=24)
 
+# Compress JSON responses, brotli when the client takes it
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 1024
+if COMPRESS_AVAILABLE:
+    Compress(app)
+
 # Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
 # SocketIO for real-time updates
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+# msgpack packets: floats go out as binary, not ASCII. The dashboard loads the msgpack
+# build of socket.io-client to match
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, serializer='msgpack',
+                    http_compression=True, compression_threshold=512)
 
 # User manager
 user_manager = get_user_manager()
@@ -44,11 +105,28 @@ g_markets = {}
 g_exchanges = {}
 g_strategies = {}
 
+# static part of each market's /api/markets entry, rebuilt when the markets are swapped
+g_market_meta = {}
+
+# bumped whenever markets or their strategies change, part of the read-only endpoints' ETags
+g_markets_version = 0
+
+
+def _run_blocking(fn, *args):
+    """Run CPU bound work (password hashing) off the gevent hub so other clients keep being served"""
+    if ASYNC_MODE == 'gevent':
+        return gevent.get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
 
 @login_manager.user_loader
 def load_user(username):
-    """Load user for Flask-Login"""
+    """Load user for Flask-Login, once per request"""
+    cached = g.get('_loaded_user')
+    if cached is not None and cached[0] == username:
+        return cached[1]
     user = user_manager.get_user(username)
+    g._loaded_user = (username, user)
     return user
 
 
@@ -57,7 +135,7 @@ def admin_required(f):
     @wraps(f)
     @login_required
     def decorated_function(*args, **kwargs):
-        if current_user.username != 'admin':
+        if not getattr(current_user, 'roles', 0) & ROLE_ADMIN:
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -75,7 +153,7 @@ def login():
     if not username or not password:
         return jsonify({'error': 'Username and password required'}), 400
 
-    user = user_manager.authenticate(username, password)
+    user = _run_blocking(user_manager.authenticate, username, password)
     if user:
         login_user(user, remember=True)
         session.permanent = True
@@ -118,7 +196,7 @@ def register():
     password = data.get('password')
     email = data.get('email')
 
-    success, message = user_manager.create_user(username, password, email)
+    success, message = _run_blocking(user_manager.create_user, username, password, email)
     if success:
         return jsonify({'success': True, 'message': message})
     return jsonify({'error': message}), 400
@@ -132,8 +210,8 @@ def change_password():
     old_password = data.get('old_password')
     new_password = data.get('new_password')
 
-    success, message = user_manager.change_password(
-        current_user.username, old_password, new_password
+    success, message = _run_blocking(
+        user_manager.change_password, current_user.username, old_password, new_password
     )
     if success:
         return jsonify({'success': True, 'message': message})
@@ -142,19 +220,82 @@ def change_password():
 
 # ==================== Market Data Routes ====================
 
+def _json_response(payload):
+    """JSON response with numpy arrays encoded in C by orjson, stdlib json otherwise"""
+    if ORJSON_AVAILABLE:
+        return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), mimetype='application/json')
+    return Response(json.dumps(payload, default=lambda o: o.tolist()), mimetype='application/json')
+
+
+def markets_changed():
+    """Call after swapping a market's strategy, so polling clients don't keep a stale copy"""
+    global g_markets_version
+    g_markets_version += 1
+
+
+def _cached_response(tag, build, max_age=5):
+    """304 if the client already has this version (tag), else build() with ETag and a short max-age.
+    max_age=0 has the browser revalidate every time"""
+    tag = f"{g_markets_version}-{tag}"
+    if request.if_none_match.contains_weak(tag):
+        response = Response(status=304)
+    else:
+        response = build()
+        if not isinstance(response, Response):
+            return response  # errors go out as is
+    response.set_etag(tag, weak=True)
+    # per user data behind login, so only the browser may cache it
+    response.cache_control.private = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+
+def _serialize_market_static(market_key, market):
+    """Fields of a market's API entries that don't change while it runs"""
+    product = market.product.get_name() if hasattr(market, 'product') else None
+    return {
+        'key': market_key,
+        'exchange': market.exchange.name if hasattr(market, 'exchange') else 'unknown',
+        'product': product if product is not None else market_key,
+        'symbol': product if product is not None else ''
+    }
+
+
+def _get_market_meta(market_key, market):
+    """Cached static fields of a market, filled in for markets added after init"""
+    meta = g_market_meta.get(market_key)
+    if meta is None:
+        meta = g_market_meta[market_key] = _serialize_market_static(market_key, market)
+    return meta
+
+
 @app.route('/api/markets', methods=['GET'])
 @login_required
 def get_markets():
     """Get all available markets"""
-    markets = []
-    for market_key, market in g_markets.items():
-        markets.append({
-            'key': market_key,
-            'exchange': market.exchange.name if hasattr(market, 'exchange') else 'unknown',
-            'product': market.product.get_name() if hasattr(market, 'product') else market_key,
-            'status': 'active' if hasattr(market, 'running') and market.running else 'inactive'
-        })
-    return jsonify({'markets': markets})
+    running = [bool(getattr(market, 'running', False)) for market in g_markets.values()]
+
+    def build():
+        markets = []
+        for (market_key, market), is_running in zip(g_markets.items(), running):
+            entry = dict(_get_market_meta(market_key, market))
+            del entry['symbol']
+            entry['status'] = 'active' if is_running else 'inactive'
+            markets.append(entry)
+        return jsonify({'markets': markets})
+
+    # the running flags are the only live part of the response
+    return _cached_response(''.join('1' if r else '0' for r in running), build)
+
+
+_candle_open = attrgetter('open')
+_candle_high = attrgetter('high')
+_candle_low = attrgetter('low')
+_candle_close = attrgetter('close')
+_candle_volume = attrgetter('volume')
 
 
 @app.route('/api/markets/<market_key>/candles', methods=['GET'])
@@ -169,20 +310,29 @@ def get_market_candles(market_key):
         return jsonify({'error': 'Market not found'}), 404
 
     try:
-        candles = []
         candle_list = market.candles[-limit:] if hasattr(market, 'candles') else []
+        n = len(candle_list)
+
+        # column-major, one array per field; ms conversion done on the whole column
+        try:
+            times = np.fromiter((c.time.timestamp() for c in candle_list), dtype=np.float64, count=n)
+        except AttributeError:
+            times = np.fromiter((c.time.timestamp() if hasattr(c, 'time') else 0.0 for c in candle_list),
+                                dtype=np.float64, count=n)
+        try:
+            volumes = np.fromiter(map(_candle_volume, candle_list), dtype=np.float64, count=n)
+        except AttributeError:
+            volumes = np.fromiter((getattr(c, 'volume', 0) for c in candle_list), dtype=np.float64, count=n)
+        candles = {
+            'time': (times * 1000).astype(np.int64),
+            'open': np.fromiter(map(_candle_open, candle_list), dtype=np.float64, count=n),
+            'high': np.fromiter(map(_candle_high, candle_list), dtype=np.float64, count=n),
+            'low': np.fromiter(map(_candle_low, candle_list), dtype=np.float64, count=n),
+            'close': np.fromiter(map(_candle_close, candle_list), dtype=np.float64, count=n),
+            'volume': volumes
+        }
 
-        for candle in candle_list:
-            candles.append({
-                'time': int(candle.time.timestamp() * 1000) if hasattr(candle, 'time') else 0,
-                'open': float(candle.open),
-                'high': float(candle.high),
-                'low': float(candle.low),
-                'close': float(candle.close),
-                'volume': float(candle.volume) if hasattr(candle, 'volume') else 0
-            })
-
-        return jsonify({'candles': candles})
+        return _json_response({'candles': candles})
     except Exception as e:
         log.error(f"Error getting candles: {e}")
         return jsonify({'error': str(e)}), 500
@@ -196,7 +346,7 @@ def get_market_indicators(market_key):
     if not market:
         return jsonify({'error': 'Market not found'}), 404
 
-    try:
+    def build():
         indicators = {}
         if hasattr(market, 'strategy') and market.strategy:
             strategy = market.strategy
@@ -207,6 +357,9 @@ def get_market_indicators(market_key):
                     indicators[name] = periods
 
         return jsonify({'indicators': indicators})
+
+    try:
+        return _cached_response(f"{market_key}-{id(getattr(market, 'strategy', None)):x}", build)
     except Exception as e:
         log.error(f"Error getting indicators: {e}")
         return jsonify({'error': str(e)}), 500
@@ -239,27 +392,53 @@ def get_positions():
         return jsonify({'error': str(e)}), 500
 
 
+_order_fields = attrgetter('id', 'side', 'size', 'price', 'status', 'time')
+
+
+@lru_cache(maxsize=8192)
+def _order_time_iso(order_time):
+    """An order's time never changes, so polls reuse its ISO string"""
+    return order_time.isoformat()
+
+
+def _order_fields_partial(order):
+    """_order_fields for orders missing some of the attributes"""
+    return (order.id if hasattr(order, 'id') else '',
+            order.side if hasattr(order, 'side') else '',
+            order.size if hasattr(order, 'size') else 0,
+            order.price if hasattr(order, 'price') else 0,
+            order.status if hasattr(order, 'status') else '',
+            order.time if hasattr(order, 'time') else None)
+
+
+def _market_order_rows(market_key, market):
+    """(time, row) of a market's last 100 orders, newest first"""
+    symbol = _get_market_meta(market_key, market)['symbol']
+    for order in reversed(market.orders[-100:]):  # Last 100 orders
+        try:
+            order_id, side, size, price, status, order_time = _order_fields(order)
+        except AttributeError:
+            order_id, side, size, price, status, order_time = _order_fields_partial(order)
+        yield (order_time if order_time is not None else datetime.min), {
+            'id': order_id,
+            'symbol': symbol,
+            'side': side,
+            'quantity': float(size),
+            'price': float(price),
+            'status': status,
+            'time': _order_time_iso(order_time) if order_time is not None else ''
+        }
+
+
 @app.route('/api/orders', methods=['GET'])
 @login_required
 def get_orders():
     """Get order history"""
     try:
-        # Get orders from markets
-        orders = []
-        for market_key, market in g_markets.items():
-            if hasattr(market, 'orders'):
-                for order in market.orders[-100:]:  # Last 100 orders
-                    orders.append({
-                        'id': order.id if hasattr(order, 'id') else '',
-                        'symbol': market.product.get_name() if hasattr(market, 'product') else '',
-                        'side': order.side if hasattr(order, 'side') else '',
-                        'quantity': float(order.size) if hasattr(order, 'size') else 0,
-                        'price': float(order.price) if hasattr(order, 'price') else 0,
-                        'status': order.status if hasattr(order, 'status') else '',
-                        'time': order.time.isoformat() if hasattr(order, 'time') else ''
-                    })
-
-        orders.sort(key=lambda x: x['time'], reverse=True)
+        # Get orders from markets, each market's are already newest first so just merge them
+        per_market = [_market_order_rows(market_key, market)
+                      for market_key, market in g_markets.items() if hasattr(market, 'orders')]
+        orders = [row for _, row in heapq.merge(*per_market, key=itemgetter(0), reverse=True)]
         return jsonify({'orders': orders})
     except Exception as e:
         log.error(f"Error getting orders: {e}")
@@ -287,14 +466,13 @@ def get_trades():
 def get_pnl():
     """Get current P&L"""
     try:
-        risk_manager = get_risk_manager()
-        pnl = risk_manager.get_daily_pnl()
+        revision, pnl, _ = get_risk_manager().snapshot()
 
-        return jsonify({
+        return _cached_response(f"pnl-{revision}", lambda: jsonify({
             'realized': float(pnl['realized']),
             'unrealized': float(pnl['unrealized']),
             'total': float(pnl['total'])
-        })
+        }), max_age=0)
     except Exception as e:
         log.error(f"Error getting P&L: {e}")
         return jsonify({'error': str(e)}), 500
@@ -305,10 +483,9 @@ def get_pnl():
 def get_risk_status():
     """Get risk management status"""
     try:
-        risk_manager = get_risk_manager()
-        stats = risk_manager.get_stats()
+        revision, _, stats = get_risk_manager().snapshot()
 
-        return jsonify(stats)
+        return _cached_response(f"risk-{revision}", lambda: jsonify(stats), max_age=0)
     except Exception as e:
         log.error(f"Error getting risk status: {e}")
         return jsonify({'error': str(e)}), 500
@@ -320,17 +497,20 @@ def get_risk_status():
 @login_required
 def get_strategies():
     """Get all strategies"""
-    strategies = []
-    for market_key, market in g_markets.items():
-        if hasattr(market, 'strategy') and market.strategy:
-            strategy = market.strategy
-            strategies.append({
-                'market': market_key,
-                'name': strategy.name if hasattr(strategy, 'name') else 'Unknown',
-                'status': 'active'
-            })
+    def build():
+        strategies = []
+        for market_key, market in g_markets.items():
+            if hasattr(market, 'strategy') and market.strategy:
+                strategy = market.strategy
+                strategies.append({
+                    'market': market_key,
+                    'name': strategy.name if hasattr(strategy, 'name') else 'Unknown',
+                    'status': 'active'
+                })
 
-    return jsonify({'strategies': strategies})
+        return jsonify({'strategies': strategies})
+
+    return _cached_response('strategies', build)
 
 
 # ==================== WebSocket Events ====================
@@ -368,6 +548,38 @@ def handle_unsubscribe(data):
 
 # ==================== Broadcasting Functions ====================
 
+# tick-rate updates are queued per (event, room) and flushed as one '<event>_batch' emit
+EMIT_BATCH_INTERVAL = 0.05  # secs
+_emit_queue = {}
+_emit_lock = threading.Lock()
+_emit_task = None
+
+
+def _queue_emit(event, data, room):
+    """Queue an update for the next batch flush"""
+    global _emit_task
+    with _emit_lock:
+        _emit_queue.setdefault((event, room), []).append(data)
+        if _emit_task is None:
+            _emit_task = socketio.start_background_task(_flush_emits)
+
+
+def _flush_emits():
+    """Background loop sending the queued updates"""
+    global _emit_queue
+    while True:
+        socketio.sleep(EMIT_BATCH_INTERVAL)
+        with _emit_lock:
+            if not _emit_queue:
+                continue
+            pending, _emit_queue = _emit_queue, {}
+        for (event, room), batch in pending.items():
+            try:
+                socketio.emit(event + '_batch', batch, room=room)
+            except Exception as e:
+                log.error(f"Error broadcasting {event} batch: {e}")
+
+
 def broadcast_candle_update(market_key, candle):
     """Broadcast candle update to subscribed clients"""
     try:
@@ -380,7 +592,7 @@ def broadcast_candle_update(market_key, candle):
             'close': float(candle.close),
             'volume': float(candle.volume) if hasattr(candle, 'volume') else 0
         }
-        socketio.emit('candle_update', data, room='candles')
+        _queue_emit('candle_update', data, 'candles')
     except Exception as e:
         log.error(f"Error broadcasting candle: {e}")
 
@@ -396,7 +608,7 @@ def broadcast_position_update(symbol, position):
             'unrealized_pnl': float(position.get('unrealized_pnl', 0)),
             'trailing_sl': float(position.get('trailing_sl', 0)) if position.get('trailing_sl') else None
         }
-        socketio.emit('position_update', data, room='positions')
+        _queue_emit('position_update', data, 'positions')
     except Exception as e:
         log.error(f"Error broadcasting position: {e}")
 
@@ -408,9 +620,9 @@ def broadcast_pnl_update(pnl):
             'realized': float(pnl['realized']),
             'unrealized': float(pnl['unrealized']),
             'total': float(pnl['total']),
-            'timestamp': datetime.now().isoformat()
+            'ts': time.time_ns() // 1_000_000  # epoch ms
         }
-        socketio.emit('pnl_update', data, room='pnl')
+        _queue_emit('pnl_update', data, 'pnl')
     except Exception as e:
         log.error(f"Error broadcasting P&L: {e}")
 
@@ -425,25 +637,52 @@ def broadcast_trade_update(trade):
 
 # ==================== Static File Routes ====================
 
+# page name -> (html bytes, etag), read on first hit and dropped on SIGHUP
+_pages = {}
+
+
+def _serve_page(name):
+    """Serve an html page of web_enhanced from memory, 304 if the client has it"""
+    page = _pages.get(name)
+    if page is None:
+        with open(os.path.join(app.root_path, 'web_enhanced', name), 'rb') as f:
+            body = f.read()
+        page = _pages[name] = (body, hashlib.blake2b(body, digest_size=8).hexdigest())
+    body, etag = page
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='text/html')
+    response.set_etag(etag)
+    return response
+
+
+def _reload_pages(signum, frame):
+    _pages.clear()
+    log.info("html pages will be re-read")
+
+
 @app.route('/')
 def index():
     """Serve main dashboard"""
-    return send_from_directory('web_enhanced', 'index.html')
+    return _serve_page('index.html')
 
 
 @app.route('/login')
 def login_page():
     """Serve login page"""
-    return send_from_directory('web_enhanced', 'login.html')
+    return _serve_page('login.html')
 
 
 # ==================== Server Initialization ====================
 
 def init_api_server(markets=None, exchanges=None):
     """Initialize API server with market data"""
-    global g_markets, g_exchanges
+    global g_markets, g_exchanges, g_market_meta
     if markets:
         g_markets = markets
+        g_market_meta = {key: _serialize_market_static(key, market) for key, market in markets.items()}
+        markets_changed()
     if exchanges:
         g_exchanges = exchanges
     log.info("API server initialized")
@@ -451,7 +690,10 @@ def init_api_server(markets=None, exchanges=None):
 
 def run_api_server(host='0.0.0.0', port=8080):
     """Run the API server"""
-    log.info(f"Starting enhanced API server on {host}:{port}")
+    log.info(f"Starting enhanced API server on {host}:{port} ({ASYNC_MODE})")
+    if hasattr(signal, 'SIGHUP'):
+        # kill -HUP re-reads edited html pages without a restart
+        signal.signal(signal.SIGHUP, _reload_pages)
     socketio.run(app, host=host, port=port, debug=False, use_reloader=False)
 
 
@@ -5,9 +5,16 @@
  Copyright: (c) 2024 Wolfinch Contributors
 '''
 
+import os
+import hmac
 import json
+import time
+import sqlite3
+import hashlib
+import threading
 import bcrypt
 from pathlib import Path
+from contextlib import contextmanager
 from datetime import datetime
 
 from utils import getLogger
@@ -15,25 +22,123 @@ from utils import getLogger
 log = getLogger('Auth')
 log.setLevel(log.INFO)
 
+# User.roles bits
+ROLE_ADMIN = 1
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+    ARGON2_AVAILABLE = True
+    _argon2 = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=4)
+except ImportError:
+    ARGON2_AVAILABLE = False
+    log.warning("argon2 not available, hashing passwords with bcrypt. Install with: pip install argon2-cffi")
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+# Both KDFs release the GIL, so concurrent logins already run on separate cores. Running more
+# of them than there are cores only queues CPU and stacks up argon2's 64 MiB per hash.
+_kdf_slots = threading.BoundedSemaphore(os.cpu_count() or 4)
+
+
+def _hash_password(password):
+    """Hash a new password, argon2id if installed, bcrypt otherwise"""
+    with _kdf_slots:
+        if ARGON2_AVAILABLE:
+            return _argon2.hash(password)
+        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def _verify_password(password, password_hash):
+    """Check a password against an argon2 or (legacy) bcrypt hash"""
+    if password_hash.startswith('$argon2'):
+        if not ARGON2_AVAILABLE:
+            log.error("argon2 password hash found, but argon2 is not installed")
+            return False
+        try:
+            with _kdf_slots:
+                return _argon2.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    with _kdf_slots:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def _needs_rehash(password_hash):
+    """bcrypt records and argon2 ones with old parameters get rehashed on login"""
+    if not ARGON2_AVAILABLE:
+        return False
+    if not password_hash.startswith('$argon2'):
+        return True
+    return _argon2.check_needs_rehash(password_hash)
+
+
+# Recently verified passwords, so session re-checks and socket reconnects skip the KDF.
+# Keyed by (username, hmac of the password under a per-process key), the plain password
+# is never kept. Only successful checks are cached, failed logins always pay the full hash.
+_VERIFY_TTL = 60
+_VERIFY_CACHE_SIZE = 1024
+_verify_key = os.urandom(32)
+_verify_cache = {}  # (username, pw_mac) -> (verified_at, password_hash)
+_verify_lock = threading.Lock()
+
+
+def _password_mac(password):
+    return hmac.new(_verify_key, password.encode('utf-8'), hashlib.sha256).digest()
+
+
+def _forget_verified(username):
+    """Drop the cached verifications of a user"""
+    with _verify_lock:
+        for key in [k for k in _verify_cache if k[0] == username]:
+            del _verify_cache[key]
+
 
 class User:
     """User model for authentication"""
 
-    def __init__(self, username, password_hash, email=None, created_at=None):
+    def __init__(self, username, password_hash, email=None, created_at=None, roles=0):
         self.username = username
         self.password_hash = password_hash
         self.email = email
+        self.roles = roles
         self.created_at = created_at or datetime.now().isoformat()
-        self.is_authenticated = False
         self.is_active = True
         self.is_anonymous = False
 
+    @property
+    def is_authenticated(self):
+        # only logged in users reach Flask-Login, and User objects are shared between threads
+        return True
+
     def get_id(self):
         return self.username
 
     def check_password(self, password):
         """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        key = (self.username, _password_mac(password))
+        now = time.monotonic()
+        with _verify_lock:
+            hit = _verify_cache.get(key)
+        if hit and hit[1] == self.password_hash and now - hit[0] < _VERIFY_TTL:
+            return True
+
+        if not _verify_password(password, self.password_hash):
+            return False
+
+        with _verify_lock:
+            if len(_verify_cache) >= _VERIFY_CACHE_SIZE:
+                for k in [k for k, v in _verify_cache.items() if now - v[0] >= _VERIFY_TTL]:
+                    del _verify_cache[k]
+                if len(_verify_cache) >= _VERIFY_CACHE_SIZE:
+                    _verify_cache.clear()
+            _verify_cache[key] = (now, self.password_hash)
+        return True
 
     def to_dict(self):
         return {
@@ -46,24 +151,46 @@ class User:
 class UserManager:
     """Manages user authentication"""
 
-    def __init__(self, users_file='data/users.json'):
-        self.users_file = Path(users_file)
+    def __init__(self, users_db='data/users.db', users_file='data/users.json'):
+        self.users_db = Path(users_db)
+        self.users_file = Path(users_file)  # legacy json store, imported once
         self.users = {}
+        self._db_lock = threading.RLock()
+        self._open_db()
         self._load_users()
 
+    def _open_db(self):
+        """Open the users table, WAL so each change is a single small write"""
+        self.users_db.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(self.users_db), isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS users ("
+                        "username TEXT PRIMARY KEY, password_hash TEXT NOT NULL, "
+                        "email TEXT, created_at TEXT, roles INTEGER NOT NULL DEFAULT 0)")
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(users)")]
+        if 'roles' not in columns:
+            # table from before roles, the admin account keeps its admin rights
+            self.db.execute("ALTER TABLE users ADD COLUMN roles INTEGER NOT NULL DEFAULT 0")
+            self.db.execute("UPDATE users SET roles=? WHERE username='admin'", (ROLE_ADMIN,))
+
     def _load_users(self):
-        """Load users from file"""
+        """Load users from db"""
         try:
-            if self.users_file.exists():
-                with open(self.users_file, 'r') as f:
-                    data = json.load(f)
-                    for username, user_data in data.items():
-                        self.users[username] = User(
-                            username=username,
-                            password_hash=user_data['password_hash'],
-                            email=user_data.get('email'),
-                            created_at=user_data.get('created_at')
-                        )
+            with self._db_lock:
+                rows = self.db.execute(
+                    "SELECT username, password_hash, email, created_at, roles FROM users").fetchall()
+            for username, password_hash, email, created_at, roles in rows:
+                self.users[username] = User(
+                    username=username,
+                    password_hash=password_hash,
+                    email=email,
+                    created_at=created_at,
+                    roles=roles
+                )
+            if not self.users and self.users_file.exists():
+                self._import_users_file()
+            if self.users:
                 log.info(f"Loaded {len(self.users)} users")
             else:
                 # Create default admin user
@@ -72,35 +199,67 @@ class UserManager:
             log.error(f"Error loading users: {e}")
             self.create_default_admin()
 
-    def _save_users(self):
-        """Save users to file"""
+    def _import_users_file(self):
+        """Move the users of the old json store into the db, one transaction"""
+        count = 0
+        with open(self.users_file, 'rb') as f, self.batch():
+            # ijson streams the entries, so a big file isn't held in memory twice
+            entries = ijson.kvitems(f, '') if IJSON_AVAILABLE else json.load(f).items()
+            for username, user_data in entries:
+                user = User(
+                    username=username,
+                    password_hash=user_data['password_hash'],
+                    email=user_data.get('email'),
+                    created_at=user_data.get('created_at'),
+                    roles=ROLE_ADMIN if username == 'admin' else 0
+                )
+                self.users[username] = user
+                self._save_user(user)
+                count += 1
+        log.info(f"Imported {count} users from {self.users_file}")
+
+    @contextmanager
+    def batch(self):
+        """Commit all user changes made inside the block in one transaction, for bulk admin scripts.
+        Other threads' writes wait until the block ends. Changes made before an error are still kept."""
+        with self._db_lock:
+            self.db.execute("BEGIN")
+            try:
+                yield self
+            finally:
+                self.db.execute("COMMIT")
+
+    def _save_user(self, user):
+        """Insert or update one user"""
+        try:
+            with self._db_lock:
+                self.db.execute(
+                    "INSERT OR REPLACE INTO users (username, password_hash, email, created_at, roles) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (user.username, user.password_hash, user.email, user.created_at, user.roles))
+        except Exception as e:
+            log.error(f"Error saving user {user.username}: {e}")
+
+    def _delete_user(self, username):
+        """Remove one user"""
         try:
-            self.users_file.parent.mkdir(parents=True, exist_ok=True)
-            data = {}
-            for username, user in self.users.items():
-                data[username] = {
-                    'password_hash': user.password_hash,
-                    'email': user.email,
-                    'created_at': user.created_at
-                }
-            with open(self.users_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            log.info("Users saved successfully")
+            with self._db_lock:
+                self.db.execute("DELETE FROM users WHERE username=?", (username,))
         except Exception as e:
-            log.error(f"Error saving users: {e}")
+            log.error(f"Error deleting user {username}: {e}")
 
     def create_default_admin(self):
         """Create default admin user"""
         default_password = 'admin123'  # Change this in production!
-        password_hash = bcrypt.hashpw(default_password.encode('utf-8'), bcrypt.gensalt())
 
         admin = User(
             username='admin',
-            password_hash=password_hash.decode('utf-8'),
-            email='admin@wolfinch.local'
+            password_hash=_hash_password(default_password),
+            email='admin@wolfinch.local',
+            roles=ROLE_ADMIN
         )
         self.users['admin'] = admin
-        self._save_users()
+        self._save_user(admin)
 
         log.warning("Created default admin user (username: admin, password: admin123)")
         log.warning("CHANGE THE DEFAULT PASSWORD IMMEDIATELY!")
@@ -114,14 +273,13 @@ class UserManager:
             return False, "Password must be at least 6 characters"
 
         try:
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
             user = User(
                 username=username,
-                password_hash=password_hash.decode('utf-8'),
+                password_hash=_hash_password(password),
                 email=email
             )
             self.users[username] = user
-            self._save_users()
+            self._save_user(user)
             log.info(f"Created user: {username}")
             return True, "User created successfully"
         except Exception as e:
@@ -132,7 +290,10 @@ class UserManager:
         """Authenticate a user"""
         user = self.users.get(username)
         if user and user.check_password(password):
-            user.is_authenticated = True
+            if _needs_rehash(user.password_hash):
+                user.password_hash = _hash_password(password)
+                self._save_user(user)
+                log.info(f"Rehashed password of user: {username}")
             log.info(f"User authenticated: {username}")
             return user
         log.warning(f"Authentication failed for: {username}")
@@ -155,9 +316,9 @@ class UserManager:
             return False, "New password must be at least 6 characters"
 
         try:
-            password_hash = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            user.password_hash = password_hash.decode('utf-8')
-            self._save_users()
+            user.password_hash = _hash_password(new_password)
+            _forget_verified(username)
+            self._save_user(user)
             log.info(f"Password changed for user: {username}")
             return True, "Password changed successfully"
         except Exception as e:
@@ -171,7 +332,8 @@ class UserManager:
 
         if username in self.users:
             del self.users[username]
-            self._save_users()
+            _forget_verified(username)
+            self._delete_user(username)
             log.info(f"Deleted user: {username}")
             return True, "User deleted successfully"
         return False, "User not found"
@@ -59,19 +59,19 @@ function initWebSocket() {
         console.log('WebSocket disconnected');
     });
 
-    // Real-time candle updates
-    socket.on('candle_update', (data) => {
-        updateChart(data);
+    // Real-time candle updates, batched by the server
+    socket.on('candle_update_batch', (batch) => {
+        batch.forEach(updateChart);
     });
 
-    // Real-time position updates
-    socket.on('position_update', (data) => {
-        updatePositionDisplay(data);
+    // Real-time position updates, batched by the server; the display reloads all positions
+    socket.on('position_update_batch', (batch) => {
+        updatePositionDisplay(batch[batch.length - 1]);
     });
 
-    // Real-time P&L updates
-    socket.on('pnl_update', (data) => {
-        updatePnLDisplay(data);
+    // Real-time P&L updates, batched by the server, only the latest matters
+    socket.on('pnl_update_batch', (batch) => {
+        updatePnLDisplay(batch[batch.length - 1]);
     });
 
     // Real-time trade updates
@@ -114,7 +114,16 @@ async function loadCandles(marketKey) {
         const data = await response.json();
 
         if (data.candles) {
-            chartData = data.candles;
+            // served column-major, one array per field
+            const c = data.candles;
+            chartData = c.time.map((time, i) => ({
+                time: time,
+                open: c.open[i],
+                high: c.high[i],
+                low: c.low[i],
+                close: c.close[i],
+                volume: c.volume[i]
+            }));
             initChart();
         }
     } catch (error) {